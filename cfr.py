@@ -5,21 +5,102 @@ Supports two modes (auto-detected):
   1. Copy-based: game.apply_action returns a new state (kuhn3p, nlhe3p)
   2. Step-back-based: game uses shared env with undo_action() (rlcard_nlhe3p)
 
-  
+Storage layout: info keys are interned to integer row ids at discovery
+time, and regrets / strategy sums live in two contiguous 2D float32
+tables (structure-of-arrays). Row views replace per-key dict lookups in
+the hot path, and whole-table sweeps (avg regret) vectorize.
 
 Notes:
     - We might want to include a calculated parameter that measures how "exploitable" a play/hand is by finding how many chips would be lost against a "best response" play
         -- To do this we might fix the strategies of colluding bots and find the best way to exploit their strategies - this is our measure of convergence
 """
 
+import random
+
 import numpy as np
 
 
+def sample_action_index(probs, rng=random):
+    """
+    Sample an index from a probability vector via inverse CDF.
+    np.random.choice validates and renormalizes on every call, which
+    dwarfs the actual sampling cost for the tiny action sets used here.
+    rng: anything with a .random() method (random module or Random instance).
+    """
+    r = rng.random()
+    c = 0.0
+    last = 0
+    for i, p in enumerate(probs):
+        c += p
+        if r < c:
+            return i
+        last = i
+    return last
+
+
+def _parallel_worker(args):
+    """
+    Run a batch of MCCFR iterations in a worker process.
+    Receives a snapshot of the master's sums, runs `batch` iterations on a
+    local trainer, and returns sparse delta dicts (true scale) for the
+    master to merge.
+    """
+    (game_name, regret_sum, strategy_sum, start_iter, batch,
+     num_players, use_linear_cfr, prune_threshold) = args
+    import importlib
+    import os
+
+    game = importlib.import_module(game_name)
+    if hasattr(game, "init_env"):
+        game.init_env()  # step-back games need their own env per process
+
+    # Forked workers inherit the parent's RNG state; reseed so each
+    # worker samples different hands.
+    seed = (os.getpid() * 1_000_003 + start_iter) % (2 ** 32)
+    np.random.seed(seed)
+    random.seed(seed)
+    if hasattr(game, "seed"):
+        game.seed(seed)
+
+    trainer = CFRTrainer(game, num_players=num_players,
+                         use_linear_cfr=use_linear_cfr,
+                         prune_threshold=prune_threshold)
+    trainer.rng.seed(seed)
+    trainer.import_sums(regret_sum, strategy_sum)
+    base_regret = regret_sum
+    base_strategy = strategy_sum
+
+    for t in range(start_iter + 1, start_iter + batch + 1):
+        trainer.iteration = t
+        for traverser in range(num_players):
+            state = game.deal_new_hand()
+            trainer.traverse(state, traverser)
+
+    new_regret, new_strategy = trainer.export_sums()
+    regret_delta = {}
+    for k, v in new_regret.items():
+        base = base_regret.get(k)
+        d = v if base is None else v - base
+        if d.any():
+            regret_delta[k] = d
+    strategy_delta = {}
+    for k, v in new_strategy.items():
+        base = base_strategy.get(k)
+        d = v if base is None else v - base
+        if d.any():
+            strategy_delta[k] = d
+    return regret_delta, strategy_delta, trainer.action_map
+
+
 class CFRTrainer:
+    # Initial table capacity; rows double when exceeded
+    _INITIAL_ROWS = 1024
+    _INITIAL_COLS = 4
+
     def __init__(self, game_module, num_players=3, use_linear_cfr=True, prune_threshold=-300):
 
         """Note: We might want to occasionally re-introduce "pruned" strategies so that the bots don't "cut out" a viable action due to bad luck and never rediscover it"""
-        
+
         self.game = game_module
         self.num_players = num_players
         self.use_linear_cfr = use_linear_cfr
@@ -28,95 +109,368 @@ class CFRTrainer:
         # Auto-detect if game uses step_back pattern
         self.use_step_back = hasattr(game_module, 'undo_action')
 
-        # Core data structures
-        self.regret_sum = {}     # info_key -> np.array of cumulative regrets
-        self.strategy_sum = {}   # info_key -> np.array of cumulative strategy
+        # Optional hook: once the traverser has folded, their payoff is fixed
+        # and no regret/strategy updates can happen below, so the subtree
+        # can be cut immediately.
+        self._traverser_inactive = getattr(game_module, 'is_traverser_inactive', None)
+
+        # Games that precompute current_player/legal_actions/info_key on the
+        # state let us read them as attributes instead of calling accessors.
+        self._precomputed_nodes = getattr(game_module, 'PRECOMPUTED_NODES', False)
+
+        # Games with a fixed 2-action set (Kuhn) get a scalar-specialized
+        # traversal: all-python-float math, no per-node ndarray ops.
+        if getattr(game_module, 'FIXED_NUM_ACTIONS', None) == 2:
+            self.traverse = self.cfr_traverse_2a
+        else:
+            self.traverse = self.cfr_traverse
+
+        # Core data structures: info keys are interned to row ids; sums are
+        # contiguous float32 tables so row access is a view and table-wide
+        # sweeps vectorize. float32 halves memory/bandwidth and is ample
+        # once sums are normalized. Packing rows into shared tables also
+        # avoids a per-info-set ndarray object, whose ~100-byte header
+        # would dwarf the few floats it holds at NLHE info-set counts.
+        self.id_of = {}          # info_key -> row id
         self.action_map = {}     # info_key -> list of actions
+        self.regret_tbl = np.zeros((self._INITIAL_ROWS, self._INITIAL_COLS),
+                                   dtype=np.float32)
+        self.strategy_tbl = np.zeros_like(self.regret_tbl)
+        self._row_actions = np.zeros(self._INITIAL_ROWS, dtype=np.int32)
+        # Deferred Linear CFR weighting: sums for a row are stored scaled by
+        # 1/_row_weight[row]. true_sum = stored * weight. Regret matching and
+        # averaging are scale-invariant, so the per-visit multiply by the
+        # iteration weight becomes at most one rescale per (row, iteration).
+        self._row_weight = np.ones(self._INITIAL_ROWS)
+
+        # Regret-matched strategy cache; entries dropped when regrets change.
+        # Regrets only change on traverser visits, so opponent nodes (the
+        # majority under external sampling) reuse the cached array.
+        self._strategy_cache = {}
+        # Per-depth scratch buffers for action values, so cfr_traverse does
+        # not allocate np.zeros at every traverser node.
+        self._values_stack = []
+
+        # Own RNG instance: avoids numpy's global generator (locking +
+        # validation) for the scalar draws on the hot path.
+        self.rng = random.Random()
 
         self.iteration = 0
 
+    # ---- Table management ----
+
+    def _grow_rows(self):
+        new_cap = self.regret_tbl.shape[0] * 2
+        cols = self.regret_tbl.shape[1]
+        regret = np.zeros((new_cap, cols), dtype=np.float32)
+        regret[:self.regret_tbl.shape[0]] = self.regret_tbl
+        strategy = np.zeros_like(regret)
+        strategy[:self.strategy_tbl.shape[0]] = self.strategy_tbl
+        self.regret_tbl = regret
+        self.strategy_tbl = strategy
+        row_actions = np.zeros(new_cap, dtype=np.int32)
+        row_actions[:len(self._row_actions)] = self._row_actions
+        self._row_actions = row_actions
+        row_weight = np.ones(new_cap)
+        row_weight[:len(self._row_weight)] = self._row_weight
+        self._row_weight = row_weight
+
+    def _grow_cols(self, num_actions):
+        rows = self.regret_tbl.shape[0]
+        regret = np.zeros((rows, num_actions), dtype=np.float32)
+        regret[:, :self.regret_tbl.shape[1]] = self.regret_tbl
+        strategy = np.zeros_like(regret)
+        strategy[:, :self.strategy_tbl.shape[1]] = self.strategy_tbl
+        self.regret_tbl = regret
+        self.strategy_tbl = strategy
+
+    def _row_of(self, info_key, num_actions):
+        """Row id for info_key, interning it on first sight."""
+        row = self.id_of.get(info_key)
+        if row is None:
+            row = len(self.id_of)
+            self.id_of[info_key] = row
+            if row >= self.regret_tbl.shape[0]:
+                self._grow_rows()
+            if num_actions > self.regret_tbl.shape[1]:
+                self._grow_cols(num_actions)
+            self._row_actions[row] = num_actions
+        return row
+
+    @property
+    def num_info_sets(self):
+        return len(self.id_of)
+
+    # ---- Strategies ----
+
     def get_strategy(self, info_key, num_actions):
         """Regret matching: convert regrets to action probabilities."""
-        regrets = self.regret_sum.get(info_key, np.zeros(num_actions))
-        positive = np.maximum(regrets, 0)
+        row = self.id_of.get(info_key)
+        if row is None:
+            return np.full(num_actions, 1.0 / num_actions)
+        return self._strategy_for_row(row, num_actions)
+
+    def _strategy_for_row(self, row, num_actions):
+        cached = self._strategy_cache.get(row)
+        if cached is not None and len(cached) == num_actions:
+            return cached
+        strategy = self._compute_strategy(row, num_actions)
+        self._strategy_cache[row] = strategy
+        return strategy
+
+    def _compute_strategy(self, row, num_actions):
+        regrets = self.regret_tbl[row]
+        if num_actions == 2:
+            # Scalar fast path: 2-action games (Kuhn) spend most of their
+            # time here, and tiny numpy ops cost more than the math.
+            r0, r1 = regrets[0], regrets[1]
+            p0 = r0 if r0 > 0 else 0.0
+            p1 = r1 if r1 > 0 else 0.0
+            total = p0 + p1
+            if total <= 0:
+                return np.array([0.5, 0.5], dtype=np.float32)
+            return np.array([p0 / total, p1 / total], dtype=np.float32)
+        positive = np.maximum(regrets[:num_actions], 0)
         total = positive.sum()
         if total > 0:
             return positive / total
-        return np.ones(num_actions) / num_actions
+        return np.full(num_actions, 1.0 / num_actions, dtype=np.float32)
 
     def get_average_strategy(self, info_key):
         """Final strategy after training (normalized cumulative strategy)."""
-        if info_key not in self.strategy_sum:
+        row = self.id_of.get(info_key)
+        if row is None:
             return None
-        s = self.strategy_sum[info_key]
+        n = self._row_actions[row]
+        s = self.strategy_tbl[row, :n]
         total = s.sum()
         if total > 0:
             return s / total
-        return np.ones(len(s)) / len(s)
+        return np.ones(n) / n
+
+    # ---- Traversal ----
+
+    def _values_buffer(self, depth, num_actions):
+        """Zeroed scratch array for this recursion depth (reused across visits)."""
+        stack = self._values_stack
+        while len(stack) <= depth:
+            stack.append(np.zeros(8))
+        buf = stack[depth]
+        if len(buf) < num_actions:
+            buf = np.zeros(num_actions)
+            stack[depth] = buf
+        view = buf[:num_actions]
+        view[:] = 0.0
+        return view
+
+    # Frame layout for the explicit traversal stack in cfr_traverse:
+    # [state, row, strategy, values, actions,
+    #  current action index (-1 = none started yet),
+    #  apply_action count between the parent's child start and this frame,
+    #  regret row view for pruning (None = pruning off),
+    #  deferred weight for pruning]
 
     def cfr_traverse(self, state, traverser):
-        """Recursive MCCFR with external sampling."""
-        if self.game.is_terminal(state):
-            return self.game.get_payoffs(state)[traverser]
-
-        if self.game.is_chance_node(state):
-            new_state = self.game.sample_chance(state)
-            return self.cfr_traverse(new_state, traverser)
-
-        player = self.game.get_current_player(state)
-        actions = self.game.get_legal_actions(state)
-        info_key = self.game.get_info_key(state, player)
-        num_actions = len(actions)
+        """
+        MCCFR with external sampling, driven by an explicit frame stack.
+
+        NLHE trees (4 streets x re-raises) get deep enough that Python's
+        per-call frame setup is significant and sys.setrecursionlimit is a
+        real limit. Only traverser decision points become stack frames;
+        terminal checks, chance nodes and sampled opponent actions all run
+        inline in the descent loop.
+        """
+        game = self.game
+        use_step_back = self.use_step_back
+        inactive = self._traverser_inactive
+        precomputed = self._precomputed_nodes
+        rng = self.rng
+
+        frames = []   # open traverser decision points
+        node = state
+        undo = 0      # apply_action calls since the last frame/child start
+        value = None  # completed subtree value waiting to propagate
+
+        while True:
+            # ---- Descend until a leaf value or a new traverser frame ----
+            while value is None:
+                if game.is_terminal(node):
+                    value = game.get_payoffs(node)[traverser]
+                    break
+                if game.is_chance_node(node):
+                    node = game.sample_chance(node)
+                    continue
+                if inactive is not None and inactive(node, traverser):
+                    value = game.get_payoffs(node)[traverser]
+                    break
+
+                if precomputed:
+                    player = node.current_player
+                    actions = node.legal_actions
+                    info_key = node.info_key
+                else:
+                    player = game.get_current_player(node)
+                    actions = game.get_legal_actions(node)
+                    info_key = game.get_info_key(node, player)
+                num_actions = len(actions)
+                if num_actions == 0:
+                    value = 0.0
+                    break
+
+                if info_key not in self.action_map:
+                    self.action_map[info_key] = list(actions)
+                row = self._row_of(info_key, num_actions)
+                strategy = self._strategy_for_row(row, num_actions)
+
+                if player != traverser:
+                    # ---- Sample ONE opponent action ----
+                    idx = sample_action_index(strategy, rng)
+                    node = game.apply_action(node, actions[idx])
+                    undo += 1
+                    continue
 
-        if num_actions == 0:
-            return 0.0
+                # ---- Traverser node: explore ALL actions via a frame ----
+                if self.prune_threshold is None or self.iteration <= 100:
+                    regret_row = None
+                    row_weight = 1.0
+                else:
+                    regret_row = self.regret_tbl[row]
+                    row_weight = self._row_weight[row]
+                values = self._values_buffer(len(frames), num_actions)
+                frames.append([node, row, strategy, values, actions,
+                               -1, undo, regret_row, row_weight])
+                undo = 0
+                break
+
+            # ---- Propagate values / advance the top frame ----
+            while True:
+                if value is not None:
+                    # Unwind the applies made since this child started
+                    if use_step_back:
+                        for _ in range(undo):
+                            game.undo_action()
+                    undo = 0
+                    if not frames:
+                        return value
+                    frame = frames[-1]
+                    frame[3][frame[5]] = value
+                    value = None
+                frame = frames[-1]
+                actions = frame[4]
+                num_actions = len(actions)
+                regret_row = frame[7]
+                i = frame[5] + 1
+                if regret_row is not None:
+                    threshold = self.prune_threshold
+                    w = frame[8]
+                    while i < num_actions and regret_row[i] * w < threshold \
+                            and rng.random() < 0.95:
+                        i += 1
+                if i < num_actions:
+                    # Start the next child; back to the descent loop
+                    frame[5] = i
+                    node = game.apply_action(frame[0], actions[i])
+                    undo = 1
+                    break
+
+                # ---- Frame complete: regret/strategy update, bubble ev ----
+                row = frame[1]
+                strategy = frame[2]
+                values = frame[3]
+                ev = strategy @ values
+                regret_update = values - ev
+
+                if self.use_linear_cfr:
+                    # Rescale stored sums from the last update's weight to
+                    # this iteration's, then accumulate unweighted.
+                    t = self.iteration or 1
+                    last = self._row_weight[row]
+                    if last != t:
+                        scale = last / t
+                        self.regret_tbl[row] *= scale
+                        self.strategy_tbl[row] *= scale
+                        self._row_weight[row] = t
+                self.regret_tbl[row, :num_actions] += regret_update
+                self.strategy_tbl[row, :num_actions] += strategy
+                self._strategy_cache.pop(row, None)
+
+                frames.pop()
+                value = ev
+                undo = frame[6]
+
+    def cfr_traverse_2a(self, state, traverser, depth=0):
+        """
+        cfr_traverse specialized for games with exactly 2 actions per node.
+        2-element numpy ops cost more than the math itself, so everything
+        here is scalar Python floats reading/writing table elements directly.
+        """
+        game = self.game
+        if game.is_terminal(state):
+            return game.get_payoffs(state)[traverser]
+
+        if game.is_chance_node(state):
+            return self.cfr_traverse_2a(game.sample_chance(state),
+                                        traverser, depth + 1)
+
+        if self._precomputed_nodes:
+            player = state.current_player
+            actions = state.legal_actions
+            info_key = state.info_key
+        else:
+            player = game.get_current_player(state)
+            actions = game.get_legal_actions(state)
+            info_key = game.get_info_key(state, player)
 
         if info_key not in self.action_map:
             self.action_map[info_key] = list(actions)
 
-        strategy = self.get_strategy(info_key, num_actions)
+        row = self._row_of(info_key, 2)
+        regret_row = self.regret_tbl[row]
+        r0 = regret_row[0]
+        r1 = regret_row[1]
+        p0 = r0 if r0 > 0 else 0.0
+        p1 = r1 if r1 > 0 else 0.0
+        total = p0 + p1
+        if total > 0:
+            p0 /= total
+            p1 /= total
+        else:
+            p0 = p1 = 0.5
 
         if player == traverser:
-            # ---- Explore ALL traverser actions ----
-            values = np.zeros(num_actions)
-            for i, action in enumerate(actions):
-                if self._should_prune(info_key, i, num_actions):
-                    continue
-
-                next_state = self.game.apply_action(state, action)
-                values[i] = self.cfr_traverse(next_state, traverser)
-                if self.use_step_back:
-                    self.game.undo_action()
-
-            ev = strategy @ values
-            regret_update = values - ev
-            weight = self.iteration if self.use_linear_cfr else 1
-
-            if info_key not in self.regret_sum:
-                self.regret_sum[info_key] = np.zeros(num_actions)
-            self.regret_sum[info_key] += regret_update * weight
-
-            if info_key not in self.strategy_sum:
-                self.strategy_sum[info_key] = np.zeros(num_actions)
-            self.strategy_sum[info_key] += strategy * weight
-
+            w = self._row_weight[row]
+            prune = self.prune_threshold is not None and self.iteration > 100
+            v0 = 0.0
+            v1 = 0.0
+            if not (prune and r0 * w < self.prune_threshold
+                    and self.rng.random() < 0.95):
+                v0 = self.cfr_traverse_2a(
+                    game.apply_action(state, actions[0]), traverser, depth + 1)
+            if not (prune and r1 * w < self.prune_threshold
+                    and self.rng.random() < 0.95):
+                v1 = self.cfr_traverse_2a(
+                    game.apply_action(state, actions[1]), traverser, depth + 1)
+
+            ev = p0 * v0 + p1 * v1
+            if self.use_linear_cfr:
+                t = self.iteration or 1
+                if w != t:
+                    scale = w / t
+                    regret_row *= scale
+                    self.strategy_tbl[row] *= scale
+                    self._row_weight[row] = t
+            regret_row[0] += v0 - ev
+            regret_row[1] += v1 - ev
+            strategy_row = self.strategy_tbl[row]
+            strategy_row[0] += p0
+            strategy_row[1] += p1
             return ev
         else:
-            # ---- Sample ONE opponent action ----
-            action_idx = np.random.choice(num_actions, p=strategy)
-            next_state = self.game.apply_action(state, actions[action_idx])
-            val = self.cfr_traverse(next_state, traverser)
-            if self.use_step_back:
-                self.game.undo_action()
-            return val
-
-    def _should_prune(self, info_key, action_idx, num_actions):
-        if self.prune_threshold is None or self.iteration <= 100:
-            return False
-        regrets = self.regret_sum.get(info_key, np.zeros(num_actions))
-        if action_idx < len(regrets) and regrets[action_idx] < self.prune_threshold:
-            return np.random.random() < 0.95
-        return False
+            a = 0 if self.rng.random() < p0 else 1
+            return self.cfr_traverse_2a(
+                game.apply_action(state, actions[a]), traverser, depth + 1)
+
+    # ---- Training loops ----
 
     def train(self, num_iterations, log_interval=1000):
         """Main training loop."""
@@ -127,28 +481,88 @@ class CFRTrainer:
             self.iteration = t
             for traverser in range(self.num_players):
                 state = self.game.deal_new_hand()
-                self.cfr_traverse(state, traverser)
+                self.traverse(state, traverser)
 
             if t % log_interval == 0:
                 avg_regret = self._compute_avg_regret()
                 print(f"  Iter {t}/{num_iterations} | "
-                      f"Info sets: {len(self.regret_sum)} | "
+                      f"Info sets: {self.num_info_sets} | "
                       f"Avg regret: {avg_regret:.7f}")
 
-        print(f"Training complete. {len(self.regret_sum)} info sets.")
-
-    # def _compute_avg_regret(self):
-    #     if not self.regret_sum:
-    #         return 0.0
-        
-    #     total = sum(np.abs(r).mean() for r in self.regret_sum.values())
-    #     avg = total / len(self.regret_sum)
-    #     if self.use_linear_cfr and self.iteration > 0:
-    #         avg /= self.iteration
-    #     return avg
+        print(f"Training complete. {self.num_info_sets} info sets.")
+
+    def train_parallel(self, num_iterations, num_workers=None, batch_size=50,
+                       log_interval=1000):
+        """
+        Parallel training: iterations are farmed out to worker processes in
+        batches. Each worker starts from a snapshot of the current sums and
+        returns sparse deltas, which the master merges (regret sums are
+        additive, so merging is exact up to batch staleness).
+        """
+        import multiprocessing as mp
+
+        num_workers = num_workers or mp.cpu_count()
+        game_name = self.game.__name__
+        print(f"Starting parallel MCCFR for {num_iterations} iterations "
+              f"({num_workers} workers, batch {batch_size})...")
+
+        done = 0
+        next_log = log_interval
+        with mp.Pool(num_workers) as pool:
+            while done < num_iterations:
+                regret_snapshot, strategy_snapshot = self.export_sums()
+                jobs = []
+                for _ in range(num_workers):
+                    if done >= num_iterations:
+                        break
+                    batch = min(batch_size, num_iterations - done)
+                    jobs.append((
+                        game_name, regret_snapshot, strategy_snapshot,
+                        self.iteration + done, batch, self.num_players,
+                        self.use_linear_cfr, self.prune_threshold,
+                    ))
+                    done += batch
+
+                for regret_delta, strategy_delta, action_map in pool.map(
+                        _parallel_worker, jobs):
+                    self._merge_deltas(regret_delta, strategy_delta, action_map)
+
+                if log_interval and done >= next_log:
+                    self.iteration = self.iteration + done
+                    avg_regret = self._compute_avg_regret()
+                    self.iteration = self.iteration - done
+                    print(f"  Iter {done}/{num_iterations} | "
+                          f"Info sets: {self.num_info_sets} | "
+                          f"Avg regret: {avg_regret:.7f}")
+                    next_log += log_interval
+
+        self.iteration += num_iterations
+        print(f"Training complete. {self.num_info_sets} info sets.")
+
+    def _merge_deltas(self, regret_delta, strategy_delta, action_map):
+        """Add true-scale worker deltas into the tables."""
+        for k in set(regret_delta) | set(strategy_delta):
+            rd = regret_delta.get(k)
+            sd = strategy_delta.get(k)
+            n = len(rd) if rd is not None else len(sd)
+            row = self._row_of(k, n)
+            # Bring the row back to true scale (factor 1) before adding
+            factor = self._row_weight[row]
+            if factor != 1:
+                self.regret_tbl[row] *= factor
+                self.strategy_tbl[row] *= factor
+                self._row_weight[row] = 1
+            if rd is not None:
+                self.regret_tbl[row, :len(rd)] += rd
+            if sd is not None:
+                self.strategy_tbl[row, :len(sd)] += sd
+            self._strategy_cache.pop(row, None)
+        for k, actions in action_map.items():
+            if k not in self.action_map:
+                self.action_map[k] = actions
 
     def _compute_avg_regret(self):
-        if not self.regret_sum or self.iteration == 0:
+        if not self.id_of or self.iteration == 0:
             return 0.0
 
         # 1. Calculate the correct denominator (sum of weights)
@@ -159,32 +573,61 @@ class CFRTrainer:
         else:
             sum_weights = self.iteration
 
-        # 2. Calculate average positive regret
-        # CFR minimizes the positive part of regret; negative values indicate 
+        # 2. Average positive regret, vectorized over the whole table.
+        # CFR minimizes the positive part of regret; negative values indicate
         # actions we already know are bad and shouldn't inflate our average.
-        total_positive_regret = 0.0
-        for regrets in self.regret_sum.values():
-            # Use the mean of positive regrets across actions for this info set
-            total_positive_regret += np.maximum(regrets, 0).mean()
+        # Unused trailing columns are zero, so sum then divide by the true
+        # per-row action count; _row_weight undoes the deferred 1/t scale.
+        n = self.num_info_sets
+        positive = np.maximum(self.regret_tbl[:n], 0)
+        per_row = positive.sum(axis=1) / self._row_actions[:n] * self._row_weight[:n]
+        total_positive_regret = per_row.sum()
 
         # 3. Normalize by both the number of info sets and the cumulative weight
-        avg_regret = (total_positive_regret / len(self.regret_sum)) / sum_weights
+        avg_regret = (total_positive_regret / n) / sum_weights
         return avg_regret
 
     def get_all_strategies(self):
         strategies = {}
-        for info_key in self.strategy_sum:
+        for info_key in self.id_of:
             avg = self.get_average_strategy(info_key)
             actions = self.action_map.get(info_key, [])
             if avg is not None:
                 strategies[info_key] = (actions, avg)
         return strategies
 
+    # ---- Persistence (dict-of-arrays format, true scale) ----
+
+    def export_sums(self):
+        """Sums as {info_key: array} dicts in true Linear CFR scale."""
+        regret_sum = {}
+        strategy_sum = {}
+        for info_key, row in self.id_of.items():
+            n = self._row_actions[row]
+            w = self._row_weight[row]
+            regret_sum[info_key] = self.regret_tbl[row, :n] * w
+            strategy_sum[info_key] = self.strategy_tbl[row, :n] * w
+        return regret_sum, strategy_sum
+
+    def import_sums(self, regret_sum, strategy_sum):
+        """Load sums from {info_key: array} dicts (true scale)."""
+        for info_key, regrets in regret_sum.items():
+            row = self._row_of(info_key, len(regrets))
+            if len(regrets) > self.regret_tbl.shape[1]:
+                self._grow_cols(len(regrets))
+            self.regret_tbl[row, :len(regrets)] = regrets
+            self._row_weight[row] = 1
+            strategies = strategy_sum.get(info_key)
+            if strategies is not None:
+                self.strategy_tbl[row, :len(strategies)] = strategies
+        self._strategy_cache = {}
+
     def save(self, path):
         import pickle
+        regret_sum, strategy_sum = self.export_sums()
         data = {
-            "regret_sum": self.regret_sum,
-            "strategy_sum": self.strategy_sum,
+            "regret_sum": regret_sum,
+            "strategy_sum": strategy_sum,
             "action_map": self.action_map,
             "iteration": self.iteration,
         }
@@ -196,8 +639,7 @@ class CFRTrainer:
         import pickle
         with open(path, "rb") as f:
             data = pickle.load(f)
-        self.regret_sum = data["regret_sum"]
-        self.strategy_sum = data["strategy_sum"]
+        self.import_sums(data["regret_sum"], data["strategy_sum"])
         self.action_map = data["action_map"]
         self.iteration = data["iteration"]
-        print(f"Loaded from {path} (iter {self.iteration})")
\ No newline at end of file
+        print(f"Loaded from {path} (iter {self.iteration})")
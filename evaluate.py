@@ -2,8 +2,15 @@
 Evaluation: play trained agents against each other and measure mbb/g.
 """
 
+import random
+
 import numpy as np
 
+from cfr import sample_action_index
+
+# Evaluation RNG (cheaper than numpy's global generator for scalar draws)
+_rng = random.Random()
+
 
 def play_hand(game, trainer, num_players=3):
     """
@@ -31,7 +38,7 @@ def play_hand(game, trainer, num_players=3):
             avg_strategy = np.ones(len(actions)) / len(actions)
 
         # Sample action from average strategy
-        action_idx = np.random.choice(len(actions), p=avg_strategy)
+        action_idx = sample_action_index(avg_strategy, _rng)
         state = game.apply_action(state, actions[action_idx])
 
     return game.get_payoffs(state)
@@ -9,33 +9,80 @@ Rules:
 - This is small enough to verify CFR convergence.
 """
 
-import numpy as np
-from copy import deepcopy
+import itertools
+import random
 
 
 NUM_PLAYERS = 3
 DECK = [0, 1, 2, 3]
 ACTIONS = ["pass", "bet"]
 
+# Every decision node offers exactly these 2 actions; the CFR trainer
+# uses this to pick its scalar-specialized traversal.
+FIXED_NUM_ACTIONS = 2
+
+# Module RNG: random.Random is much cheaper than numpy's global generator
+# for the scalar draws done once per hand.
+_rng = random.Random()
+
+
+def seed(n):
+    """Seed the module RNG (used by parallel training workers)."""
+    _rng.seed(n)
+
+# All 24 possible deals, precomputed so dealing is a single randrange()
+# instead of a sampling routine per hand.
+DEAL_TABLE = [tuple(p) for p in itertools.permutations(DECK, 3)]
+
+# States carry precomputed current_player / legal_actions / info_key
+# attributes, so the CFR trainer can skip the per-node accessor calls.
+PRECOMPUTED_NODES = True
+
 
 class KuhnState:
+    __slots__ = (
+        "cards",
+        "history",
+        "active",
+        "pot",
+        "current_player",
+        "bets_this_round",
+        "history_code",
+        "legal_actions",
+        "info_key",
+    )
+
     def __init__(self):
-        self.cards = None          # list of 3 cards, one per player
+        self.cards = None          # tuple of 3 cards, one per player (immutable after deal)
         self.history = []          # list of actions taken
         self.active = [True] * 3   # who hasn't folded
         self.pot = [1, 1, 1]       # ante of 1 each
         self.current_player = 0
         self.bets_this_round = 0   # how many bets have been made
+        self.history_code = 0      # base-3 encoding of history (1=pass, 2=bet)
+        self.legal_actions = ACTIONS
+        self.info_key = 0          # info key for current_player, kept in sync
 
     def copy(self):
-        return deepcopy(self)
+        # Manual copy: deepcopy dominates CFR traversal time, and the state
+        # is just a few small lists and ints.
+        s = KuhnState()
+        s.cards = self.cards           # immutable tuple, safe to share
+        s.history = self.history[:]
+        s.active = self.active[:]
+        s.pot = self.pot[:]
+        s.current_player = self.current_player
+        s.bets_this_round = self.bets_this_round
+        s.history_code = self.history_code
+        s.info_key = self.info_key
+        return s
 
 
 def deal_new_hand():
     """Deal a new 3-player Kuhn hand."""
     state = KuhnState()
-    cards = list(np.random.choice(DECK, size=3, replace=False))
-    state.cards = cards
+    state.cards = DEAL_TABLE[_rng.randrange(24)]
+    state.info_key = state.cards[0] << 8  # player 0 acts first, empty history
     return state
 
 
@@ -49,12 +96,16 @@ def get_legal_actions(state):
 
 def get_info_key(state, player):
     """
-    Info set key: player's card + the action history they've observed.
-    e.g., "2:pass-bet" means player holds card 2, saw pass then bet.
+    Info set key: player's card + the action history they've observed,
+    packed into a single int (card in the high bits, base-3 history code
+    in the low 8 bits). Int keys hash much faster than formatted strings,
+    and this is called at every node visit.
     """
-    card = state.cards[player]
-    history_str = "-".join(state.history) if state.history else ""
-    return f"{card}:{history_str}"
+    # Max history length is 5, so history_code < 3**5 = 243 fits in 8 bits.
+    return (state.cards[player] << 8) | state.history_code
+
+
+_POW3 = (1, 3, 9, 27, 81)
 
 
 def is_terminal(state):
@@ -62,24 +113,25 @@ def is_terminal(state):
     Terminal conditions for 3-player Kuhn:
     - All 3 players have acted AND no bet was made (all passed) -> showdown
     - A bet was made and all remaining players have responded -> showdown/fold resolution
-    """
-    h = state.history
-    n = len(h)
 
-    if n == 0:
+    Works purely on the base-3 history_code (no list compares / scans):
+    a terminal state needs at least 3 actions, so checks for shorter
+    histories short-circuit on the length alone.
+    """
+    n = len(state.history)
+    if n < 3:
         return False
 
-    # All 3 passed -> showdown
-    if h == ["pass", "pass", "pass"]:
+    code = state.history_code
+    # All 3 passed -> showdown ("pass,pass,pass" = 0b... 1*9 + 1*3 + 1)
+    if code == 13:
         return True
 
-    # Someone bet, and the remaining players after the bettor have all responded
-    if "bet" in h:
-        bet_idx = h.index("bet")
-        actions_after_bet = n - bet_idx - 1
-        players_who_need_to_respond = 2  # the other 2 players after bettor
-        if actions_after_bet >= players_who_need_to_respond:
-            return True
+    # Find the first bet (digit 2, most significant digit = first action);
+    # terminal once the 2 players after the bettor have responded
+    for i in range(n):
+        if (code // _POW3[n - 1 - i]) % 3 == 2:
+            return n - i - 1 >= 2
 
     return False
 
@@ -129,6 +181,7 @@ def apply_action(state, action):
     """Apply action and return new state."""
     new_state = state.copy()
     new_state.history.append(action)
+    new_state.history_code = state.history_code * 3 + (1 if action == "pass" else 2)
 
     # Advance current player
     new_state.current_player = len(new_state.history) % 3
@@ -147,6 +200,9 @@ def apply_action(state, action):
     if "bet" not in h:
         new_state.current_player = len(h) % 3
 
+    new_state.info_key = (new_state.cards[new_state.current_player] << 8) \
+        | new_state.history_code
+
     return new_state
 
 
@@ -0,0 +1,193 @@
+"""
+Numba-accelerated MCCFR for 3-player Kuhn poker.
+
+Mirrors the game rules in kuhn3p.py, but keeps the whole traversal
+numeric so it can run under @njit with no interpreter overhead:
+- cards: 3 ints
+- history: base-3 code (1=pass, 2=bet) + length, same encoding as
+  kuhn3p.KuhnState.history_code
+- regrets/strategy sums: one (4 * 243, 2) array indexed by
+  card * 243 + history_code
+
+train() runs the jitted loop and exports the result into a regular
+CFRTrainer (keys match kuhn3p.get_info_key) so evaluation and saving
+work unchanged. Requires numba; callers should fall back to the
+generic CFRTrainer when it is not installed.
+"""
+
+import numpy as np
+from numba import njit
+
+import kuhn3p
+from cfr import CFRTrainer
+
+
+N_HIST = 3 ** 5          # max 5 actions per hand
+N_ROWS = 4 * N_HIST      # 4 cards x history codes
+
+
+@njit(cache=True)
+def _decode(code, n, out):
+    """Decode base-3 history code into out[0..n-1] (0=pass, 1=bet)."""
+    c = code
+    for i in range(n - 1, -1, -1):
+        out[i] = c % 3 - 1
+        c //= 3
+
+
+@njit(cache=True)
+def _first_bet(hist, n):
+    for i in range(n):
+        if hist[i] == 1:
+            return i
+    return -1
+
+
+@njit(cache=True)
+def _next_player(code, n):
+    """Current player after n actions (same formula as kuhn3p.apply_action)."""
+    hist = np.empty(5, np.int64)
+    _decode(code, n, hist)
+    b = _first_bet(hist, n)
+    if b == -1 or n == b + 1:
+        return n % 3
+    return (b + (n - b - 1)) % 3
+
+
+@njit(cache=True)
+def _payoff(cards, hist, n, bet_idx, traverser):
+    """Terminal payoff for traverser (same rules as kuhn3p.get_payoffs)."""
+    if bet_idx == -1:
+        # All passed: highest card wins the 3-chip pot
+        winner = 0
+        for p in range(1, 3):
+            if cards[p] > cards[winner]:
+                winner = p
+        return 2.0 if winner == traverser else -1.0
+
+    bettor = bet_idx
+    # Contributions: ante 1 each, +1 for bettor and callers
+    contrib = np.ones(3)
+    contrib[bettor] = 2.0
+    winner = bettor
+    for i in range(bet_idx + 1, n):
+        player = (bettor + 1 + (i - bet_idx - 1)) % 3
+        if hist[i] == 1:  # bet after a bet = call
+            contrib[player] = 2.0
+            if cards[player] > cards[winner]:
+                winner = player
+    total = contrib[0] + contrib[1] + contrib[2]
+    payoff = -contrib[traverser]
+    if winner == traverser:
+        payoff += total
+    return payoff
+
+
+# No cache=True here: numba crashes compiling a self-recursive cached
+# function when it is called from another cached jit function (the
+# small helpers above cache fine).
+@njit
+def _traverse(cards, code, n, current, traverser,
+              regret, strat_sum, weight, prune_threshold, do_prune):
+    """External sampling MCCFR traversal; returns value for traverser."""
+    if n >= 3:
+        hist = np.empty(5, np.int64)
+        _decode(code, n, hist)
+        bet_idx = _first_bet(hist, n)
+        if bet_idx == -1:
+            return _payoff(cards, hist, n, bet_idx, traverser)
+        if n - bet_idx - 1 >= 2:
+            return _payoff(cards, hist, n, bet_idx, traverser)
+
+    row = cards[current] * N_HIST + code
+    r0 = regret[row, 0]
+    r1 = regret[row, 1]
+    p0 = r0 if r0 > 0 else 0.0
+    p1 = r1 if r1 > 0 else 0.0
+    total = p0 + p1
+    if total > 0:
+        p0 /= total
+        p1 /= total
+    else:
+        p0 = 0.5
+        p1 = 0.5
+
+    if current == traverser:
+        v0 = 0.0
+        v1 = 0.0
+        for a in range(2):
+            if do_prune and regret[row, a] < prune_threshold:
+                if np.random.random() < 0.95:
+                    continue
+            new_code = code * 3 + a + 1
+            new_n = n + 1
+            nxt = _next_player(new_code, new_n)
+            v = _traverse(cards, new_code, new_n, nxt, traverser,
+                          regret, strat_sum, weight, prune_threshold, do_prune)
+            if a == 0:
+                v0 = v
+            else:
+                v1 = v
+        ev = p0 * v0 + p1 * v1
+        regret[row, 0] += (v0 - ev) * weight
+        regret[row, 1] += (v1 - ev) * weight
+        strat_sum[row, 0] += p0 * weight
+        strat_sum[row, 1] += p1 * weight
+        return ev
+    else:
+        a = 0 if np.random.random() < p0 else 1
+        new_code = code * 3 + a + 1
+        new_n = n + 1
+        nxt = _next_player(new_code, new_n)
+        return _traverse(cards, new_code, new_n, nxt, traverser,
+                         regret, strat_sum, weight, prune_threshold, do_prune)
+
+
+# Uncached like _traverse: caching the driver pulls the recursive
+# kernel back into numba's cache compilation and crashes the same way.
+@njit
+def _run_iterations(num_iterations, start_iter, regret, strat_sum,
+                    use_linear_cfr, prune_threshold, prune_warm_up):
+    deck = np.arange(4)
+    cards = np.empty(3, np.int64)
+    prune_enabled = prune_threshold > -np.inf
+    for t in range(start_iter + 1, start_iter + num_iterations + 1):
+        weight = t if use_linear_cfr else 1
+        do_prune = prune_enabled and t > prune_warm_up
+        for traverser in range(3):
+            np.random.shuffle(deck)
+            for p in range(3):
+                cards[p] = deck[p]
+            _traverse(cards, 0, 0, 0, traverser,
+                      regret, strat_sum, weight, prune_threshold, do_prune)
+
+
+def train(num_iterations, use_linear_cfr=True, prune_threshold=-300,
+          prune_warm_up=100):
+    """
+    Run jitted Kuhn MCCFR and return a CFRTrainer holding the result.
+    Info keys match kuhn3p.get_info_key, so evaluate/save work as usual.
+    """
+    regret = np.zeros((N_ROWS, 2))
+    strat_sum = np.zeros((N_ROWS, 2))
+    threshold = -np.inf if prune_threshold is None else float(prune_threshold)
+    _run_iterations(num_iterations, 0, regret, strat_sum,
+                    use_linear_cfr, threshold, prune_warm_up)
+
+    trainer = CFRTrainer(kuhn3p, num_players=3,
+                         use_linear_cfr=use_linear_cfr,
+                         prune_threshold=prune_threshold)
+    trainer.iteration = num_iterations
+    regret_sum = {}
+    strategy_sum = {}
+    for row in range(N_ROWS):
+        if strat_sum[row, 0] == 0 and strat_sum[row, 1] == 0 \
+                and regret[row, 0] == 0 and regret[row, 1] == 0:
+            continue
+        card, code = divmod(row, N_HIST)
+        info_key = (card << 8) | code
+        regret_sum[info_key] = regret[row].copy()
+        strategy_sum[info_key] = strat_sum[row].copy()
+        trainer.action_map[info_key] = list(kuhn3p.ACTIONS)
+    trainer.import_sums(regret_sum, strategy_sum)
+    return trainer
@@ -21,9 +21,15 @@ def run_kuhn():
     print("3-Player Kuhn Poker — CFR Validation")
     print("=" * 60)
 
-    trainer = CFRTrainer(game, num_players=3, use_linear_cfr=True)
     start = time.time()
-    trainer.train(num_iterations=50_000, log_interval=10_000)
+    try:
+        # Numba-jitted traversal (kuhn3p_fast) when numba is installed
+        import kuhn3p_fast
+        trainer = kuhn3p_fast.train(num_iterations=50_000)
+        print(f"Trained {trainer.iteration} iterations (numba).")
+    except ImportError:
+        trainer = CFRTrainer(game, num_players=3, use_linear_cfr=True)
+        trainer.train(num_iterations=50_000, log_interval=10_000)
     print(f"Time: {time.time() - start:.1f}s")
 
     # Print sample strategies
@@ -11,7 +11,6 @@ Stack size: 100 big blinds (BB). Small blind = 0.5 BB, Big blind = 1 BB.
 """
 
 import numpy as np
-from copy import deepcopy
 from itertools import combinations
 from collections import Counter
 
@@ -33,17 +32,125 @@ def card_rank(card):
 def card_suit(card):
     return card // 13
 
+# Precomputed per-card rank/suit: indexing a tuple skips the frame setup
+# of a card_rank()/card_suit() call in the tight loops below.
+_RANK = tuple(c % 13 for c in range(52))
+_SUIT = tuple(c // 13 for c in range(52))
+
 
 # ============================================================
 # Hand evaluator - returns a comparable hand rank tuple
 # Higher tuple = better hand
 # ============================================================
 
+# Perfect-hash score tables, built once at import. A 5-card hand is
+# scored by a single dict probe instead of re-running _score_5:
+#   - non-flush hands key on the product of per-rank primes (order-free,
+#     collision-free, Cactus Kev style)
+#   - flush hands key on the 13-bit rank mask of the flush suit
+# _score_5 stays as the reference scorer that fills the tables.
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_CARD_PRIME = tuple(_PRIMES[c % 13] for c in range(52))
+
+
+def _build_score_tables():
+    from itertools import combinations_with_replacement
+
+    unsuited = {}
+    for ranks in combinations_with_replacement(range(13), 5):
+        counts = Counter(ranks)
+        if max(counts.values()) > 4:
+            continue
+        if len(counts) == 5:
+            # Distinct ranks: split suits so the sample isn't a flush
+            cards = [r for r in ranks[:4]] + [13 + ranks[4]]
+        else:
+            cards = []
+            for r, k in counts.items():
+                cards.extend(s * 13 + r for s in range(k))
+        key = 1
+        for r in ranks:
+            key *= _PRIMES[r]
+        unsuited[key] = _score_5(cards)
+
+    flush = {}
+    for ranks in combinations(range(13), 5):
+        mask = 0
+        for r in ranks:
+            mask |= 1 << r
+        flush[mask] = _score_5(list(ranks))  # suit 0: card == rank
+    return unsuited, flush
+
+
 def evaluate_hand(cards):
     """
     Evaluate best 5-card hand from a list of cards (5-7 cards).
     Returns a tuple that can be compared: higher = better.
     """
+    n = len(cards)
+    if n < 5 or n > 7:
+        return _evaluate_slow(cards)
+
+    # Flush check first: in at most 7 cards a flush excludes quads and
+    # full houses, so the best hand is then the best 5-card subset of
+    # the flush suit.
+    suit_count = [0, 0, 0, 0]
+    for c in cards:
+        suit_count[c // 13] += 1
+    for suit in range(4):
+        if suit_count[suit] >= 5:
+            base = suit * 13
+            ranks = [c - base for c in cards if c // 13 == suit]
+            mask = 0
+            for r in ranks:
+                mask |= 1 << r
+            k = len(ranks)
+            if k == 5:
+                return _FLUSH_SCORE[mask]
+            # 6 or 7 suited cards: enumerate 5-card subsets by clearing
+            # one or two rank bits (no combination tuples)
+            best = None
+            if k == 6:
+                for r in ranks:
+                    score = _FLUSH_SCORE[mask ^ (1 << r)]
+                    if best is None or score > best:
+                        best = score
+                return best
+            for i in range(6):
+                partial = mask ^ (1 << ranks[i])
+                for j in range(i + 1, 7):
+                    score = _FLUSH_SCORE[partial ^ (1 << ranks[j])]
+                    if best is None or score > best:
+                        best = score
+            return best
+
+    primes = [_CARD_PRIME[c] for c in cards]
+    table = _UNSUITED_SCORE
+    if n == 5:
+        return table[primes[0] * primes[1] * primes[2] * primes[3] * primes[4]]
+    total = 1
+    for p in primes:
+        total *= p
+    best = None
+    if n == 6:
+        # 6 combos: drop one card at a time
+        for p in primes:
+            score = table[total // p]
+            if best is None or score > best:
+                best = score
+        return best
+    # 21 combos: drop two cards at a time
+    for i in range(6):
+        pi = primes[i]
+        for j in range(i + 1, 7):
+            score = table[total // (pi * primes[j])]
+            if best is None or score > best:
+                best = score
+    return best
+
+
+def _evaluate_slow(cards):
+    """Reference path: enumerate all 5-card combos through _score_5."""
     best = None
     card_list = list(cards)
     for combo in combinations(card_list, 5):
@@ -53,50 +160,61 @@ def evaluate_hand(cards):
     return best
 
 
+# The 10 rank masks that form straights, mapped to the straight's high
+# rank (wheel A-2-3-4-5 counts as 5-high).
+_STRAIGHT_HIGH = {0x1F << i: i + 4 for i in range(9)}
+_STRAIGHT_HIGH[0x100F] = 3
+
+
 def _score_5(cards):
     """Score a 5-card hand. Returns comparable tuple."""
     """TODO: We might want to modify the scoring system to measure how good of a hand it is within the buckets - there are 52 distinct possible High Card ranks and even more pairs"""
-    ranks = sorted([card_rank(c) for c in cards], reverse=True)
-    suits = [card_suit(c) for c in cards]
-
-    is_flush = len(set(suits)) == 1
-
-    # Check straight
-    unique_ranks = sorted(set(ranks), reverse=True)
-    is_straight = False
-    straight_high = 0
-    if len(unique_ranks) == 5:
-        if unique_ranks[0] - unique_ranks[4] == 4:
-            is_straight = True
-            straight_high = unique_ranks[0]
-        # Ace-low straight (A-2-3-4-5)
-        if unique_ranks == [12, 3, 2, 1, 0]:
-            is_straight = True
-            straight_high = 3  # 5-high straight
-
-    # Count rank frequencies
-    counts = Counter(ranks)
-    freq = sorted(counts.values(), reverse=True)
-    # Ranks sorted by frequency then rank value
-    ranks_by_freq = sorted(counts.keys(), key=lambda r: (counts[r], r), reverse=True)
-
-    if is_straight and is_flush:
-        return (8, straight_high)       # Straight flush
-    if freq == [4, 1]:
+    # Pack the hand into one 64-bit int: four 16-bit suit rows holding
+    # rank bits 0-12. Flush, straight and rank-set structure then come
+    # from shifts and popcounts instead of sets, sorts and a Counter.
+    mask = 0
+    for c in cards:
+        mask |= 1 << ((c // 13) * 16 + c % 13)
+    s0 = mask & 0x1FFF
+    s1 = (mask >> 16) & 0x1FFF
+    s2 = (mask >> 32) & 0x1FFF
+    s3 = mask >> 48
+    all_ranks = s0 | s1 | s2 | s3
+
+    if bin(all_ranks).count("1") == 5:
+        # 5 distinct ranks: no pairs, so categories 8/5/4/0 only.
+        # A flush means one suit row holds all 5 bits.
+        is_flush = all_ranks in (s0, s1, s2, s3)
+        straight_high = _STRAIGHT_HIGH.get(all_ranks, -1)
+        if straight_high >= 0:
+            return (8, straight_high) if is_flush else (4, straight_high)
+        ranks = [r for r in range(12, -1, -1) if (all_ranks >> r) & 1]
+        if is_flush:
+            return (5, *ranks)           # Flush
+        return (0, *ranks)               # High card
+
+    # Paired hands (a flush is impossible with a repeated rank). A fixed
+    # 13-slot histogram replaces the Counter dict; sorting the (count,
+    # rank) pairs descending gives the frequency-then-rank kicker order.
+    hist = bytearray(13)
+    for c in cards:
+        hist[c % 13] += 1
+    pairs = [(hist[r], r) for r in range(13) if hist[r]]
+    pairs.sort(reverse=True)
+    freq = [f for f, _ in pairs]
+    ranks_by_freq = [r for _, r in pairs]
+    if freq[0] == 4:
         return (7, *ranks_by_freq)       # Four of a kind
-    if freq == [3, 2]:
+    if freq[0] == 3 and freq[1] == 2:
         return (6, *ranks_by_freq)       # Full house
-    if is_flush:
-        return (5, *ranks)               # Flush
-    if is_straight:
-        return (4, straight_high)        # Straight
-    if freq == [3, 1, 1]:
+    if freq[0] == 3:
         return (3, *ranks_by_freq)       # Three of a kind
-    if freq == [2, 2, 1]:
+    if freq[1] == 2:
         return (2, *ranks_by_freq)       # Two pair
-    if freq == [2, 1, 1, 1]:
-        return (1, *ranks_by_freq)       # One pair
-    return (0, *ranks)                   # High card
+    return (1, *ranks_by_freq)           # One pair
+
+
+_UNSUITED_SCORE, _FLUSH_SCORE = _build_score_tables()
 
 
 # ============================================================
@@ -118,22 +236,54 @@ def hand_strength_bucket(hole_cards, board_cards, num_buckets=10):
         return _postflop_bucket(hole_cards, board_cards, num_buckets)
 
 
-def _preflop_bucket(hole_cards, num_buckets):
-    """Simple preflop bucketing by card ranks and suitedness."""
-    r1, r2 = sorted([card_rank(hole_cards[0]), card_rank(hole_cards[1])], reverse=True)
-    suited = card_suit(hole_cards[0]) == card_suit(hole_cards[1])
+def _hole_canonical_id(c0, c1):
+    """169-class canonical preflop id: pairs 0-12, then (high, low, suited)."""
+    r0, r1 = c0 % 13, c1 % 13
+    high, low = (r0, r1) if r0 >= r1 else (r1, r0)
+    if high == low:
+        return high
+    suited = (c0 // 13) == (c1 // 13)
+    return 13 + (high - 1) * high + 2 * low + (0 if suited else 1)
+
+
+def _score_to_bucket(score, num_buckets):
+    """Map the preflop strength score formula onto a bucket id."""
+    # Strength score: high card combo + suited bonus + pair bonus
+    max_score = 12 * 13 + 12 + 100 + 20  # AA (pair bonus dominates)
+    bucket = int((score / (max_score + 1)) * num_buckets)
+    return min(bucket, num_buckets - 1)
+
+
+def _build_preflop_table(num_buckets):
+    """Bucket id for each of the 169 canonical preflop classes."""
+    table = [0] * 169
+    for high in range(13):
+        table[high] = _score_to_bucket(high * 13 + high + 100, num_buckets)
+        for low in range(high):
+            for suited in (True, False):
+                cid = 13 + (high - 1) * high + 2 * low + (0 if suited else 1)
+                score = high * 13 + low + (20 if suited else 0)
+                table[cid] = _score_to_bucket(score, num_buckets)
+    return table
+
 
-    # Simple strength score: high card combo + suited bonus + pair bonus
+# Preflop bucketing only ever uses 10 buckets (see get_info_key); there
+# are just 169 distinct preflop hands, so precompute the whole map.
+_PREFLOP_TABLE_10 = _build_preflop_table(10)
+
+
+def _preflop_bucket(hole_cards, num_buckets):
+    """Preflop bucketing by card ranks and suitedness (table lookup)."""
+    if num_buckets == 10:
+        return _PREFLOP_TABLE_10[_hole_canonical_id(hole_cards[0], hole_cards[1])]
+    r1, r2 = sorted([_RANK[hole_cards[0]], _RANK[hole_cards[1]]], reverse=True)
+    suited = _SUIT[hole_cards[0]] == _SUIT[hole_cards[1]]
     score = r1 * 13 + r2
     if r1 == r2:
         score += 100  # pair bonus
-    if suited:
+    elif suited:
         score += 20   # suited bonus
-
-    # Map to bucket (0 to num_buckets-1)
-    max_score = 12 * 13 + 12 + 100 + 20  # AA suited
-    bucket = int((score / (max_score + 1)) * num_buckets)
-    return min(bucket, num_buckets - 1)
+    return _score_to_bucket(score, num_buckets)
 
 
 def _postflop_bucket(hole_cards, board_cards, num_buckets, num_rollouts=10):
@@ -150,7 +300,7 @@ def _postflop_bucket(hole_cards, board_cards, num_buckets, num_rollouts=10):
         return min(bucket, num_buckets - 1)
     else:
         # Not enough cards yet, use simple rank-based bucket
-        ranks = sorted([card_rank(c) for c in hole_cards], reverse=True)
+        ranks = sorted([_RANK[c] for c in hole_cards], reverse=True)
         score = ranks[0] * 13 + ranks[1]
         bucket = int((score / (12 * 13 + 12 + 1)) * num_buckets)
         return min(bucket, num_buckets - 1)
@@ -173,6 +323,10 @@ ALL_IN = "all_in"
 
 ALL_ACTIONS = [FOLD, CHECK, CALL, BET_HALF, BET_POT, ALL_IN]
 
+# 3-bit id per action, for the packed integer history encoding.
+# Ids start at 1 so a leading fold can't disappear into the zero prefix.
+_ACTION_ID = {FOLD: 1, CHECK: 2, CALL: 3, BET_HALF: 4, BET_POT: 5, ALL_IN: 6}
+
 NUM_PLAYERS = 3
 STARTING_STACK = 100  # in big blinds
 SMALL_BLIND = 0.5
@@ -180,8 +334,38 @@ BIG_BLIND = 1.0
 
 
 class NLHEState:
+    # __slots__ turns attribute access into fixed-offset loads and drops
+    # the per-instance __dict__. The per-player vectors stay as plain
+    # lists on purpose: packing stacks/bets/active/all_in into one
+    # float32 ndarray saves ~60ns per copy() but costs 50-100ns extra on
+    # every scalar read/write, and the betting logic does dozens of those
+    # per action - measured as a net loss under CFR traversal.
+    __slots__ = (
+        "deck",
+        "deck_idx",
+        "hole_cards",
+        "board",
+        "round_idx",
+        "stacks",
+        "pot",
+        "bets",
+        "active",
+        "all_in",
+        "current_player",
+        "actions_this_round",
+        "history",
+        "num_actions_this_round",
+        "last_raiser",
+        "done",
+        "history_int",
+        "max_bet",
+        "active_mask",
+        "can_act_mask",
+    )
+
     def __init__(self):
         self.deck = list(range(52))
+        self.deck_idx = 0
         self.hole_cards = [[], [], []]  # 2 cards per player
         self.board = []                  # community cards
         self.round_idx = 0               # 0=preflop, 1=flop, 2=turn, 3=river
@@ -196,9 +380,39 @@ class NLHEState:
         self.num_actions_this_round = 0
         self.last_raiser = -1
         self.done = False
+        self.history_int = 0             # packed history: 3 bits per action
+        # Cached aggregates, kept in sync by apply_action so the hot
+        # helpers don't rescan the per-player lists:
+        self.max_bet = 0.0               # == max(self.bets)
+        self.active_mask = (1 << NUM_PLAYERS) - 1   # bit p set: hasn't folded
+        self.can_act_mask = (1 << NUM_PLAYERS) - 1  # active and not all-in
 
     def copy(self):
-        return deepcopy(self)
+        # Manual clone: deepcopy walks the pickle protocol per action and
+        # dominates CFR recursion cost; the state is just small lists of
+        # primitives, so shallow list copies are all that's needed.
+        n = NLHEState.__new__(NLHEState)
+        n.deck = self.deck  # immutable after the shuffle; share
+        n.deck_idx = self.deck_idx
+        n.hole_cards = self.hole_cards  # dealt once per hand; share
+        n.board = self.board[:]
+        n.round_idx = self.round_idx
+        n.stacks = self.stacks[:]
+        n.pot = self.pot
+        n.bets = self.bets[:]
+        n.active = self.active[:]
+        n.all_in = self.all_in[:]
+        n.current_player = self.current_player
+        n.actions_this_round = self.actions_this_round[:]
+        n.history = self.history[:]
+        n.num_actions_this_round = self.num_actions_this_round
+        n.last_raiser = self.last_raiser
+        n.done = self.done
+        n.history_int = self.history_int
+        n.max_bet = self.max_bet
+        n.active_mask = self.active_mask
+        n.can_act_mask = self.can_act_mask
+        return n
 
 
 # ============================================================
@@ -208,6 +422,11 @@ class NLHEState:
 def deal_new_hand():
     """Deal a fresh 3-player NLHE hand."""
     state = NLHEState()
+    # Only 11 of the 52 cards are ever consumed, but the C-level list
+    # shuffle (~2us) still beats every partial-sampling alternative
+    # measured (Generator.choice without replacement ~7us, permutation
+    # + tolist ~3us, Python-level partial Fisher-Yates ~3.6us), so the
+    # full shuffle stays.
     np.random.shuffle(state.deck)
 
     # Deal hole cards
@@ -223,6 +442,7 @@ def deal_new_hand():
     state.stacks[2] -= BIG_BLIND
     state.bets[2] = BIG_BLIND
     state.pot = SMALL_BLIND + BIG_BLIND
+    state.max_bet = BIG_BLIND
 
     # Preflop action starts with player 0 (UTG/button in 3-player)
     state.current_player = 0
@@ -245,6 +465,14 @@ def is_chance_node(state):
     return False
 
 
+def is_traverser_inactive(state, player):
+    """
+    True once `player` has folded. Their payoff is then fixed (chips already
+    in the pot, no way to win), so CFR can stop traversing the subtree.
+    """
+    return not state.active[player]
+
+
 def sample_chance(state):
     return state
 
@@ -254,10 +482,10 @@ def get_legal_actions(state):
     p = state.current_player
     actions = []
 
-    if not state.active[p] or state.all_in[p]:
+    if not (state.can_act_mask >> p) & 1:
         return []
 
-    max_bet = max(state.bets)
+    max_bet = state.max_bet
     my_bet = state.bets[p]
     to_call = max_bet - my_bet
 
@@ -295,11 +523,13 @@ def apply_action(state, action):
     new = state.copy()
     p = new.current_player
 
-    max_bet = max(new.bets)
+    max_bet = new.max_bet
     to_call = max_bet - new.bets[p]
 
     if action == FOLD:
         new.active[p] = False
+        new.active_mask &= ~(1 << p)
+        new.can_act_mask &= ~(1 << p)
     elif action == CHECK:
         pass  # no money movement
     elif action == CALL:
@@ -335,15 +565,20 @@ def apply_action(state, action):
         new.bets[p] += amount
         new.pot += amount
         new.all_in[p] = True
+        new.can_act_mask &= ~(1 << p)
         if amount > to_call:
             new.last_raiser = p
 
+    if new.bets[p] > new.max_bet:
+        new.max_bet = new.bets[p]
+
     new.history.append((new.round_idx, p, action))
+    new.history_int = (new.history_int << 3) | _ACTION_ID[action]
     new.actions_this_round.append((p, action))
     new.num_actions_this_round += 1
 
     # Check if hand is over (only 1 active player)
-    active_count = sum(new.active)
+    active_count = bin(new.active_mask).count("1")
     if active_count == 1:
         _resolve_hand(new)
         return new
@@ -357,9 +592,7 @@ def apply_action(state, action):
 def _advance_to_next_player(state):
     """Find next active player or advance to next round."""
     # Count players who can still act (active and not all-in)
-    can_act = [i for i in range(NUM_PLAYERS) if state.active[i] and not state.all_in[i]]
-
-    if len(can_act) <= 1:
+    if bin(state.can_act_mask).count("1") <= 1:
         # No more action possible, run out remaining board and resolve
         _run_out_board(state)
         _resolve_hand(state)
@@ -374,18 +607,24 @@ def _advance_to_next_player(state):
 
     # Find next active player who can act
     next_p = (state.current_player + 1) % NUM_PLAYERS
-    while not state.active[next_p] or state.all_in[next_p]:
+    while not (state.can_act_mask >> next_p) & 1:
         next_p = (next_p + 1) % NUM_PLAYERS
     state.current_player = next_p
 
 
 def _is_round_complete(state):
     """Check if all active non-all-in players have acted and bets are equal."""
-    can_act = [i for i in range(NUM_PLAYERS) if state.active[i] and not state.all_in[i]]
-
-    if len(can_act) == 0:
+    mask = state.can_act_mask
+    if mask == 0:
         return True
 
+    # Walk the set bits of the mask instead of scanning all players
+    can_act = []
+    m = mask
+    while m:
+        can_act.append((m & -m).bit_length() - 1)
+        m &= m - 1
+
     # All active players must have acted at least once
     acted_players = set(p for p, a in state.actions_this_round)
     for p in can_act:
@@ -393,9 +632,10 @@ def _is_round_complete(state):
             return False
 
     # All bets must be equal among active players (excluding all-in players who are short)
-    bets = [state.bets[p] for p in can_act]
-    if len(set(bets)) > 1:
-        return False
+    first_bet = state.bets[can_act[0]]
+    for p in can_act:
+        if state.bets[p] != first_bet:
+            return False
 
     # If someone raised, everyone after must have had a chance to respond
     if state.last_raiser >= 0:
@@ -429,6 +669,7 @@ def _advance_round(state):
 
     # Reset per-round bets
     state.bets = [0.0] * NUM_PLAYERS
+    state.max_bet = 0.0
 
     if state.round_idx > 3:
         # Showdown after river
@@ -447,7 +688,7 @@ def _advance_round(state):
     # Postflop: action starts with first active player after button (player 1, then 2, then 0)
     for offset in range(1, NUM_PLAYERS + 1):
         p = offset % NUM_PLAYERS
-        if state.active[p] and not state.all_in[p]:
+        if (state.can_act_mask >> p) & 1:
             state.current_player = p
             return
 
@@ -523,7 +764,7 @@ def get_info_key(state, player):
     num_buckets = 10 if round_idx == 0 else 8
     bucket = hand_strength_bucket(hole, board, num_buckets)
 
-    # Abstract betting history: just action names in sequence
-    hist_str = ",".join(a for _, _, a in state.history)
-
-    return f"{round_idx}|{bucket}|{hist_str}"
+    # Abstract betting history: the packed action-id int maintained by
+    # apply_action — O(1) to hash, versus rebuilding a joined string of
+    # the whole history at every node visit.
+    return (round_idx, bucket, state.history_int)
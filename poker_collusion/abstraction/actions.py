@@ -3,6 +3,8 @@ Action sets by round (10 each) and legality filtering.
 State must have: round_idx, current_player, stacks, pot, bets, active, all_in, last_raiser, last_raise_amount.
 """
 
+import functools
+
 from poker_collusion.config import NUM_PLAYERS, STARTING_STACK_BB, NUM_ACTIONS
 
 # Preflop: absolute BB amounts for raise sizes (index 2..8), 9 = all-in 20 BB
@@ -14,11 +16,11 @@ POSTFLOP_POT_MULT = [0.25, 0.33, 0.5, 0.66, 0.75, 1.0, 1.5]
 
 def _to_call(state):
     p = state.current_player
-    return max(state.bets) - state.bets[p]
+    return state.max_bet - state.bets[p]
 
 
 def _max_bet(state):
-    return max(state.bets)
+    return state.max_bet
 
 
 def _pot_for_acting(state):
@@ -40,8 +42,25 @@ def get_legal_action_indices(state):
     if not state.active[p] or state.all_in[p]:
         return []
     to_call = _to_call(state)
-    stack = state.stacks[p]
-    is_preflop = state.round_idx == 0
+    max_bet = _max_bet(state)
+    # Legality depends only on this signature, and CFR revisits the same
+    # betting situations constantly, so a memoized helper answers most calls.
+    # Keys are the exact floats (no quantization: rounding pot/stack would
+    # flip borderline min-raise/stack checks); identical situations produce
+    # bit-identical floats, so they still collide in the cache.
+    return list(_legal_cached(
+        state.round_idx == 0,
+        to_call,
+        state.stacks[p],
+        state.pot + to_call,
+        _min_raise_total(state) if max_bet > 0 else 0,
+        max_bet > 0,
+    ))
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _legal_cached(is_preflop, to_call, stack, pot, min_raise_total, has_bet):
+    """Legal action indices for one betting situation. Returns a sorted tuple."""
     legal = []
 
     if to_call > 0:
@@ -55,10 +74,9 @@ def get_legal_action_indices(state):
     if chips_after_call <= 0:
         if stack > 0 and 9 not in legal:
             legal.append(9)  # All-in for less
-        return sorted(legal)
+        return tuple(sorted(legal))
 
     if is_preflop:
-        min_raise_total = _min_raise_total(state)
         seen_totals = set()
         for i, total_bb in enumerate(PREFLOP_RAISE_BB):
             if total_bb < min_raise_total:
@@ -73,14 +91,11 @@ def get_legal_action_indices(state):
             if stack not in seen_totals:
                 legal.append(9)
     else:
-        pot = _pot_for_acting(state)
-        max_bet = _max_bet(state)
-        min_raise_total = _min_raise_total(state) if max_bet > 0 else 0
         seen_totals = set()
         for i, mult in enumerate(POSTFLOP_POT_MULT):
             bet_amount = pot * mult
             total_bet = to_call + bet_amount
-            if max_bet > 0 and total_bet < min_raise_total:
+            if has_bet and total_bet < min_raise_total:
                 continue
             if total_bet > stack:
                 continue
@@ -96,7 +111,7 @@ def get_legal_action_indices(state):
                 else:
                     legal.append(9)
 
-    return sorted(legal)
+    return tuple(sorted(legal))
 
 
 def action_index_to_chips(state, action_index):
@@ -4,6 +4,10 @@ Loads precomputed tables from data/ when available; fallback to 0.
 """
 
 import os
+
+import numpy as np
+
+from poker_collusion.rng import get_rng
 from poker_collusion.config import (
     PREFLOP_BUCKETS,
     FLOP_BUCKETS,
@@ -16,41 +20,67 @@ from poker_collusion.config import (
     RIVER_BUCKETS_FILE,
 )
 
-_preflop_table = None
-_flop_centers = None
-_turn_centers = None
-_river_centers = None
+# Compiled rollout kernel (optional): ~100x faster equity estimates.
+# The import is circular when this module is reached through
+# abstraction/__init__ (env/__init__ re-exports abstraction.info_set),
+# which used to silently disable the kernel for such importers — so a
+# failed import here is retried once the package graph is complete.
+try:
+    from poker_collusion.env import _eval_nb
+except ImportError:
+    _eval_nb = None
+
 
+def _resolve_eval_nb():
+    """Late retry of the _eval_nb import (see note above). Idempotent."""
+    global _eval_nb
+    if _eval_nb is None:
+        try:
+            from poker_collusion.env import _eval_nb as kernel
+        except ImportError:
+            return None
+        _eval_nb = kernel
+    return _eval_nb
 
 def _path(filename):
     base = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     return os.path.join(base, DEFAULT_BUCKET_DIR, filename)
 
 
-def _load_tables():
-    global _preflop_table, _flop_centers, _turn_centers, _river_centers
-    if _preflop_table is not None:
-        return
+def _load_array(filename):
+    """Memory-map a prebuilt table; None when it has not been built."""
+    p = _path(filename)
+    if not os.path.isfile(p):
+        return None
     try:
-        import pickle
-        p = _path(PREFLOP_BUCKETS_FILE)
-        if os.path.isfile(p):
-            with open(p, "rb") as f:
-                _preflop_table = pickle.load(f)
-        p = _path(FLOP_BUCKETS_FILE)
-        if os.path.isfile(p):
-            with open(p, "rb") as f:
-                _flop_centers = pickle.load(f)
-        p = _path(TURN_BUCKETS_FILE)
-        if os.path.isfile(p):
-            with open(p, "rb") as f:
-                _turn_centers = pickle.load(f)
-        p = _path(RIVER_BUCKETS_FILE)
-        if os.path.isfile(p):
-            with open(p, "rb") as f:
-                _river_centers = pickle.load(f)
+        return np.load(p, mmap_mode="r")
     except Exception:
-        pass
+        return None
+
+
+# Tables load once at import (memory-mapped, so the cost is a page table
+# entry, not a heap copy); get_bucket no longer re-checks on every call.
+_preflop_table = _load_array(PREFLOP_BUCKETS_FILE)
+_flop_centers = _load_array(FLOP_BUCKETS_FILE)
+_turn_centers = _load_array(TURN_BUCKETS_FILE)
+_river_centers = _load_array(RIVER_BUCKETS_FILE)
+
+
+def _sorted_centers(centers):
+    """
+    (sorted center values, original bucket id per sorted slot), or None.
+    Sorting once at import turns nearest-center search into a binary
+    search over a sorted float array instead of an O(k) distance scan.
+    """
+    if centers is None or len(centers) == 0:
+        return None
+    order = np.argsort(centers, kind="stable")
+    return np.asarray(centers)[order], order
+
+
+_flop_lookup = _sorted_centers(_flop_centers)
+_turn_lookup = _sorted_centers(_turn_centers)
+_river_lookup = _sorted_centers(_river_centers)
 
 
 def get_bucket(hole_cards, board, round_idx):
@@ -60,43 +90,61 @@ def get_bucket(hole_cards, board, round_idx):
     board: tuple of 0, 3, 4, or 5 ints.
     round_idx: 0=preflop, 1=flop, 2=turn, 3=river.
     """
-    _load_tables()
     if round_idx == 0:
-        if _preflop_table is not None:
-            canonical = _hole_to_canonical(hole_cards)
-            return _preflop_table.get(canonical, 0) % PREFLOP_BUCKETS
+        if _PREFLOP_DIRECT is not None:
+            return _PREFLOP_DIRECT[hole_cards[0] * 52 + hole_cards[1]]
         return _preflop_fallback(hole_cards) % PREFLOP_BUCKETS
     if round_idx == 1 and len(board) >= 3:
-        if _flop_centers is not None:
-            return _equity_to_bucket(hole_cards, board, 3, _flop_centers, FLOP_BUCKETS)
+        if _flop_lookup is not None:
+            return _equity_to_bucket(hole_cards, board, 3, _flop_lookup, FLOP_BUCKETS)
         return _postflop_fallback(hole_cards, board, FLOP_BUCKETS)
     if round_idx == 2 and len(board) >= 4:
-        if _turn_centers is not None:
-            return _equity_to_bucket(hole_cards, board, 4, _turn_centers, TURN_BUCKETS)
+        if _turn_lookup is not None:
+            return _equity_to_bucket(hole_cards, board, 4, _turn_lookup, TURN_BUCKETS)
         return _postflop_fallback(hole_cards, board, TURN_BUCKETS)
     if round_idx == 3 and len(board) >= 5:
-        if _river_centers is not None:
-            return _equity_to_bucket(hole_cards, board, 5, _river_centers, RIVER_BUCKETS)
+        if _river_lookup is not None:
+            return _equity_to_bucket(hole_cards, board, 5, _river_lookup, RIVER_BUCKETS)
         return _postflop_fallback(hole_cards, board, RIVER_BUCKETS)
     return 0
 
 
+def _build_hole_canonical_table():
+    """Canonical id for every ordered card pair (c0 * 52 + c1)."""
+    table = np.empty(52 * 52, dtype=np.int16)
+    for c0 in range(52):
+        for c1 in range(52):
+            r0, r1 = c0 % 13, c1 % 13
+            high, low = max(r0, r1), min(r0, r1)
+            if high == low:
+                cid = high
+            else:
+                suited = 1 if c0 // 13 == c1 // 13 else 0
+                cid = 13 + (high - 1) * high + 2 * low + (0 if suited else 1)
+            table[c0 * 52 + c1] = cid
+    return table
+
+
+# Only 52*52 ordered card pairs exist, so the canonical-id arithmetic
+# collapses to a flat table built once at import (this runs on every
+# preflop info_key construction).
+_HOLE_CANONICAL = _build_hole_canonical_table()
+
+# Fused hole -> preflop bucket table: collapses the canonical lookup,
+# the 169-row table index, and the modulo into one tuple index on plain
+# Python ints (a tuple, not an ndarray, so the hot read returns an int
+# without numpy scalar boxing). 2704 entries.
+_PREFLOP_DIRECT = None if _preflop_table is None else tuple(
+    int(v) % PREFLOP_BUCKETS for v in np.asarray(_preflop_table)[_HOLE_CANONICAL]
+)
+
+
 def _hole_to_canonical(hole_cards):
     """Map 2 cards to 169 canonical hand id (0..168). Matches bucketing_build.preflop_table."""
-    r0, r1 = hole_cards[0] % 13, hole_cards[1] % 13
-    s0, s1 = hole_cards[0] // 13, hole_cards[1] // 13
-    high, low = max(r0, r1), min(r0, r1)
-    if high == low:
-        return high
-    suited = 1 if s0 == s1 else 0
-    return 13 + (high - 1) * high + 2 * low + (0 if suited else 1)
+    return int(_HOLE_CANONICAL[hole_cards[0] * 52 + hole_cards[1]])
 
 
-def _preflop_fallback(hole_cards, num_buckets=PREFLOP_BUCKETS):
-    """Simple rank-based fallback when no table loaded."""
-    r0, r1 = hole_cards[0] % 13, hole_cards[1] % 13
-    high, low = max(r0, r1), min(r0, r1)
-    suited = (hole_cards[0] // 13) == (hole_cards[1] // 13)
+def _fallback_score_bucket(high, low, suited, num_buckets):
     score = high * 13 + low
     if high == low:
         score += 100
@@ -105,56 +153,229 @@ def _preflop_fallback(hole_cards, num_buckets=PREFLOP_BUCKETS):
     return int((score / (12 * 13 + 12 + 100 + 20 + 1)) * num_buckets) % num_buckets
 
 
+def _build_preflop_fallback_table(num_buckets):
+    """Fallback bucket for each of the 169 canonical preflop classes."""
+    table = [0] * 169
+    for high in range(13):
+        table[high] = _fallback_score_bucket(high, high, False, num_buckets)
+        for low in range(high):
+            for suited in (True, False):
+                cid = 13 + (high - 1) * high + 2 * low + (0 if suited else 1)
+                table[cid] = _fallback_score_bucket(high, low, suited, num_buckets)
+    return table
+
+
+# Only 169 preflop hands exist, so the fallback score formula collapses
+# to a canonical-id table built once at import.
+_PREFLOP_FALLBACK_TABLE = _build_preflop_fallback_table(PREFLOP_BUCKETS)
+
+
+def _preflop_fallback(hole_cards, num_buckets=PREFLOP_BUCKETS):
+    """Simple rank-based fallback when no table loaded."""
+    if num_buckets == PREFLOP_BUCKETS:
+        return _PREFLOP_FALLBACK_TABLE[_hole_to_canonical(hole_cards)]
+    r0, r1 = hole_cards[0] % 13, hole_cards[1] % 13
+    high, low = max(r0, r1), min(r0, r1)
+    suited = (hole_cards[0] // 13) == (hole_cards[1] // 13)
+    return _fallback_score_bucket(high, low, suited, num_buckets)
+
+
+# The postflop fallback only maps the 9 hand categories onto buckets, so
+# the float math collapses to a 9-entry tuple per configured bucket count.
+_POSTFLOP_FALLBACK = {
+    nb: tuple(int((c / 9.0) * nb) % nb for c in range(9))
+    for nb in {FLOP_BUCKETS, TURN_BUCKETS, RIVER_BUCKETS}
+}
+
+
+# hand_eval cannot be imported at module top: env/__init__ re-exports
+# abstraction.info_set, which imports this module. Bound on first
+# fallback call instead of re-resolving through sys.modules every call.
+_evaluate_hand = None
+
+
 def _postflop_fallback(hole_cards, board, num_buckets):
     """Fallback: use hand category. Requires hand_eval."""
-    from poker_collusion.env.hand_eval import evaluate_hand
+    global _evaluate_hand
+    if _evaluate_hand is None:
+        from poker_collusion.env.hand_eval import evaluate_hand
+        _evaluate_hand = evaluate_hand
     cards = list(hole_cards) + list(board)
     if len(cards) < 5:
         return 0
-    score = evaluate_hand(cards)
-    category = score[0]
+    category = _evaluate_hand(cards) >> 20  # category bits of the packed score
+    table = _POSTFLOP_FALLBACK.get(num_buckets)
+    if table is not None:
+        return table[category]
     return int((category / 9.0) * num_buckets) % num_buckets
 
 
-def _equity_to_bucket(hole_cards, board, board_len, centers, num_buckets):
+def _equity_to_bucket(hole_cards, board, board_len, center_lookup, num_buckets):
     """Assign bucket by nearest cluster center (equity)."""
     eq = _estimate_equity(hole_cards, board, board_len)
-    if centers is None or len(centers) == 0:
+    if center_lookup is None:
         return int(eq * num_buckets) % num_buckets
-    best = 0
-    best_dist = abs(eq - centers[0])
-    for i, c in enumerate(centers):
-        d = abs(eq - c)
-        if d < best_dist:
-            best_dist = d
-            best = i
-    return best % num_buckets
+    values, order = center_lookup
+    idx = int(np.searchsorted(values, eq))
+    if idx == len(values):
+        idx -= 1
+    elif idx > 0:
+        # Nearer of the two neighbours; exact midpoints go to the lower
+        # original bucket id, matching the old first-minimum linear scan.
+        d_left = eq - values[idx - 1]
+        d_right = values[idx] - eq
+        if d_left < d_right or (d_left == d_right and order[idx - 1] < order[idx]):
+            idx -= 1
+    return int(order[idx]) % num_buckets
+
+
+# Equity cache keyed on the suit-canonical (hole, board) form. CFR
+# revisits the same deal constantly while traversing a hand, so after
+# the first visit an estimate is a dict probe instead of a fresh
+# Monte Carlo run; suit relabeling also merges isomorphic deals.
+_equity_cache = {}
+_EQUITY_CACHE_MAX = 1 << 20
+
+
+def _canonicalize(hole_cards, board):
+    """
+    Relabel suits by first appearance across (hole, board), keeping
+    ranks: suit-isomorphic situations map to the same tuple of ints.
+    """
+    suit_map = {}
+    out = []
+    for c in hole_cards:
+        s = c // 13
+        m = suit_map.get(s)
+        if m is None:
+            m = len(suit_map)
+            suit_map[s] = m
+        out.append(m * 13 + c % 13)
+    for c in board:
+        s = c // 13
+        m = suit_map.get(s)
+        if m is None:
+            m = len(suit_map)
+            suit_map[s] = m
+        out.append(m * 13 + c % 13)
+    return tuple(out)
 
 
 def _estimate_equity(hole_cards, board, board_len, n_rollouts=100):
     """Monte Carlo equity estimate vs random opponent (0..1)."""
-    import random
-    from poker_collusion.env.hand_eval import evaluate_hand
+    key = _canonicalize(hole_cards, board[:board_len])
+    cached = _equity_cache.get(key)
+    if cached is not None:
+        return cached
+    eq = _run_rollouts(hole_cards, board, board_len, n_rollouts)
+    if len(_equity_cache) >= _EQUITY_CACHE_MAX:
+        _equity_cache.clear()
+    _equity_cache[key] = eq
+    return eq
+
+
+def _run_rollouts(hole_cards, board, board_len, n_rollouts):
+    kernel = _eval_nb if _eval_nb is not None else _resolve_eval_nb()
+    if kernel is not None:
+        board_arr = np.asarray(board[:board_len], dtype=np.int8)
+        return kernel.rollout_equity(int(hole_cards[0]), int(hole_cards[1]),
+                                     board_arr, board_len, n_rollouts)
+
+    # NumPy fallback: batch every rollout into one (n_rollouts, ...) set
+    # of arrays so the shuffles and hand comparisons run at C speed
+    # instead of per-rollout Python loops over evaluate_hand.
     used = set(hole_cards) | set(board[:board_len])
-    deck = [c for c in range(52) if c not in used]
-    wins = 0
-    for _ in range(n_rollouts):
-        rest = list(deck)
-        random.shuffle(rest)
-        opp = tuple(rest[:2])
-        if board_len == 3:
-            runout = rest[2:7]
-        elif board_len == 4:
-            runout = rest[2:6]
-        else:
-            runout = []
-        full_board = list(board[:board_len]) + list(runout)
-        if len(full_board) < 5:
-            continue
-        my_hand = evaluate_hand(list(hole_cards) + full_board)
-        opp_hand = evaluate_hand(list(opp) + full_board)
-        if my_hand > opp_hand:
-            wins += 1
-        elif my_hand == opp_hand:
-            wins += 0.5
-    return wins / n_rollouts
+    deck = np.array([c for c in range(52) if c not in used])
+    rest = get_rng().permuted(np.tile(deck, (n_rollouts, 1)), axis=1)
+    opp = rest[:, :2]
+    runout = rest[:, 2:2 + (5 - board_len)]
+    mine = np.tile(np.asarray(hole_cards), (n_rollouts, 1))
+    board_tile = np.tile(np.asarray(board[:board_len]), (n_rollouts, 1))
+    my_scores = _best7_batch(np.concatenate([mine, board_tile, runout], axis=1))
+    opp_scores = _best7_batch(np.concatenate([opp, board_tile, runout], axis=1))
+    wins = (my_scores > opp_scores).sum() + 0.5 * (my_scores == opp_scores).sum()
+    return float(wins) / n_rollouts
+
+
+_RANKS13 = np.arange(13)
+_COMBOS_7C5 = ((0, 1, 2, 3, 4), (0, 1, 2, 3, 5), (0, 1, 2, 3, 6),
+               (0, 1, 2, 4, 5), (0, 1, 2, 4, 6), (0, 1, 2, 5, 6),
+               (0, 1, 3, 4, 5), (0, 1, 3, 4, 6), (0, 1, 3, 5, 6),
+               (0, 1, 4, 5, 6), (0, 2, 3, 4, 5), (0, 2, 3, 4, 6),
+               (0, 2, 3, 5, 6), (0, 2, 4, 5, 6), (0, 3, 4, 5, 6),
+               (1, 2, 3, 4, 5), (1, 2, 3, 4, 6), (1, 2, 3, 5, 6),
+               (1, 2, 4, 5, 6), (1, 3, 4, 5, 6), (2, 3, 4, 5, 6))
+
+
+def _build_rank_mask_tables():
+    """8192-entry lookups on the 13-bit rank mask of an unpaired hand."""
+    straight_high = np.full(8192, -1, dtype=np.int8)
+    for i in range(9):
+        straight_high[0x1F << i] = i + 4
+    straight_high[0x100F] = 3  # wheel A-2-3-4-5
+    kick5 = np.zeros(8192, dtype=np.int64)
+    for mask in range(8192):
+        if bin(mask).count("1") == 5:
+            packed = 0
+            shift = 16
+            for r in range(12, -1, -1):
+                if (mask >> r) & 1:
+                    packed |= r << shift
+                    shift -= 4
+            kick5[mask] = packed
+    return straight_high, kick5
+
+
+_STRAIGHT_HIGH_TBL, _KICK5_TBL = _build_rank_mask_tables()
+
+
+def _score5_batch(cards):
+    """
+    Packed int scores for an (n, 5) card array: category in the high
+    bits, then kicker ranks ordered by (frequency, rank) descending.
+    Two packed scores compare exactly like hand_eval._score_5 tuples.
+    """
+    r = cards % 13
+    s = cards // 13
+    counts = (r[:, :, None] == _RANKS13).sum(axis=1)          # (n, 13)
+    rank_mask = np.bitwise_or.reduce(1 << r, axis=1)
+    flush = (s == s[:, :1]).all(axis=1)
+    distinct = (counts > 0).sum(axis=1)
+    scores = np.zeros(len(cards), dtype=np.int64)
+
+    nopair = distinct == 5
+    if nopair.any():
+        rm = rank_mask[nopair]
+        high = _STRAIGHT_HIGH_TBL[rm]
+        fl = flush[nopair]
+        straight = high >= 0
+        cat = np.where(straight, np.where(fl, 8, 4),
+                       np.where(fl, 5, 0)).astype(np.int64)
+        kick = np.where(straight, high.astype(np.int64) << 16, _KICK5_TBL[rm])
+        scores[nopair] = (cat << 20) | kick
+
+    paired = ~nopair
+    if paired.any():
+        cnt = counts[paired]
+        max_count = cnt.max(axis=1)
+        pairs = (cnt == 2).sum(axis=1)
+        cat = np.where(max_count == 4, 7,
+              np.where(max_count == 3, np.where(pairs == 1, 6, 3),
+              np.where(pairs == 2, 2, 1))).astype(np.int64)
+        # Sorting count*16+rank descending yields the (frequency, rank)
+        # kicker order; slots past the distinct-rank count are zeroed so
+        # equal hands stay exact ties.
+        keys = -np.sort(-(cnt * 16 + _RANKS13), axis=1)[:, :5]
+        kick = (keys % 16).astype(np.int64)
+        kick[np.arange(5) >= distinct[paired][:, None]] = 0
+        scores[paired] = ((cat << 20) | (kick[:, 0] << 16) | (kick[:, 1] << 12)
+                          | (kick[:, 2] << 8) | (kick[:, 3] << 4) | kick[:, 4])
+    return scores
+
+
+def _best7_batch(cards7):
+    """Best packed 5-card score per row of an (n, 7) card array."""
+    best = _score5_batch(cards7[:, _COMBOS_7C5[0]])
+    for combo in _COMBOS_7C5[1:]:
+        np.maximum(best, _score5_batch(cards7[:, combo]), out=best)
+    return best
@@ -1,18 +1,28 @@
 """
-Info set key: (card_bucket, action_history) with action indices and DEAL.
+Info set key: card bucket + action history packed into a single int.
 """
 
 from poker_collusion.abstraction.bucketing import get_bucket
 
+# Matches env.game_state.DEAL; mirrored here because importing the env
+# package from this module would be circular (env/__init__ imports us).
+DEAL = -1
+
 
 def get_info_key(state, player):
     """
-    Return hashable info set key: (bucket, tuple(action_history)).
+    Return the info set key as one int: the action history packed
+    base-12 above the card bucket in the low 8 bits (digit 1..10 per
+    action index, 11 for DEAL; 0 never occurs, so histories of
+    different lengths cannot collide). Ints hash as identity, so the
+    trainer's per-node dict lookups skip the variable-length hash the
+    old (bucket, history-tuple) keys paid; Python ints are unbounded,
+    so long histories widen the key instead of wrapping.
     state must have: hole_cards, board, round_idx, action_history.
     """
     hole = tuple(state.hole_cards[player])
-    board = tuple(state.board)
-    round_idx = state.round_idx
-    bucket = get_bucket(hole, board, round_idx)
-    history = tuple(state.action_history)
-    return (bucket, history)
+    bucket = get_bucket(hole, tuple(state.board), state.round_idx)
+    key = 0
+    for a in state.action_history:
+        key = key * 12 + (11 if a == DEAL else a + 1)
+    return (key << 8) | bucket
@@ -1,10 +1,11 @@
 """
 One-off precomputation of bucket tables (preflop and postflop).
-Run scripts/build_buckets.py to generate data/*.pkl.
+Run scripts/build_buckets.py to generate data/*.npy.
 """
 
 from poker_collusion.bucketing_build.preflop_table import build_preflop_table
 from poker_collusion.bucketing_build.postflop_table import (
+    build_all_postflop_tables,
     build_flop_table,
     build_turn_table,
     build_river_table,
@@ -12,6 +13,7 @@ from poker_collusion.bucketing_build.postflop_table import (
 
 __all__ = [
     "build_preflop_table",
+    "build_all_postflop_tables",
     "build_flop_table",
     "build_turn_table",
     "build_river_table",
@@ -0,0 +1,188 @@
+"""
+Numba-compiled batch equity kernels for the postflop table build.
+
+Each kernel runs one sample per prange iteration with a per-sample RNG
+seed, so the whole n_samples axis parallelizes across threads. The
+import fails when numba is not installed; callers are expected to catch
+ImportError and fall back to the vectorized NumPy path.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+from poker_collusion.env._eval_nb import _best_7, rollout_equity
+
+
+@njit(parallel=True, cache=True)
+def batch_runout_equity(holes, boards, board_len, n_rollouts, seed):
+    """
+    Equity vs one random opponent with a random runout, for every
+    (holes[i], boards[i]) pair. holes: int8[:, 2], boards: int8[:, board_len].
+    """
+    n = holes.shape[0]
+    out = np.empty(n, np.float64)
+    for i in prange(n):
+        np.random.seed(seed + i)
+        out[i] = rollout_equity(holes[i, 0], holes[i, 1],
+                                boards[i], board_len, n_rollouts)
+    return out
+
+
+@njit(cache=True)
+def _river_strength(hole0, hole1, board, n_rollouts):
+    """River hand strength vs 2 random opponents (equity_river scoring)."""
+    used = np.zeros(52, np.bool_)
+    used[hole0] = True
+    used[hole1] = True
+    for i in range(5):
+        used[board[i]] = True
+    deck = np.empty(45, np.int8)
+    k = 0
+    for c in range(52):
+        if not used[c]:
+            deck[k] = c
+            k += 1
+
+    my7 = np.empty(7, np.int8)
+    o17 = np.empty(7, np.int8)
+    o27 = np.empty(7, np.int8)
+    my7[0] = hole0
+    my7[1] = hole1
+    for i in range(5):
+        my7[2 + i] = board[i]
+        o17[2 + i] = board[i]
+        o27[2 + i] = board[i]
+    my_score = _best_7(my7)
+
+    wins = 0.0
+    for _ in range(n_rollouts):
+        # Partial Fisher-Yates: only 4 opponent cards are consumed
+        for i in range(4):
+            j = i + np.random.randint(0, 45 - i)
+            deck[i], deck[j] = deck[j], deck[i]
+        o17[0] = deck[0]
+        o17[1] = deck[1]
+        o27[0] = deck[2]
+        o27[1] = deck[3]
+        h1 = _best_7(o17)
+        h2 = _best_7(o27)
+        if my_score >= h1 and my_score >= h2:
+            if my_score > h1 and my_score > h2:
+                wins += 1.0
+            else:
+                wins += 0.5
+        elif my_score >= h1 or my_score >= h2:
+            wins += 0.33
+    return wins / n_rollouts
+
+
+@njit(parallel=True, cache=True)
+def batch_river_strength(holes, boards, n_rollouts, seed):
+    """River strength for every (holes[i], boards[i]). boards: int8[:, 5]."""
+    n = holes.shape[0]
+    out = np.empty(n, np.float64)
+    for i in prange(n):
+        np.random.seed(seed + i)
+        out[i] = _river_strength(holes[i, 0], holes[i, 1], boards[i], n_rollouts)
+    return out
+
+
+@njit(cache=True)
+def _all_street_equities(hole0, hole1, board, n_rollouts):
+    """
+    (flop, turn, river) equities for one deal, sharing each rollout's
+    4-card draw across the three streets: cards 0-1 are the opponent
+    (and river opponent #1), cards 2-3 the flop runout / turn river /
+    river opponent #2.
+    """
+    used = np.zeros(52, np.bool_)
+    used[hole0] = True
+    used[hole1] = True
+    for i in range(5):
+        used[board[i]] = True
+    deck = np.empty(45, np.int8)
+    k = 0
+    for c in range(52):
+        if not used[c]:
+            deck[k] = c
+            k += 1
+
+    river7 = np.empty(7, np.int8)
+    river7[0] = hole0
+    river7[1] = hole1
+    for i in range(5):
+        river7[2 + i] = board[i]
+    my_river = _best_7(river7)
+
+    my7 = np.empty(7, np.int8)
+    opp7 = np.empty(7, np.int8)
+    my7[0] = hole0
+    my7[1] = hole1
+    for i in range(3):
+        my7[2 + i] = board[i]
+        opp7[2 + i] = board[i]
+
+    wins_f = 0.0
+    wins_t = 0.0
+    wins_r = 0.0
+    for _ in range(n_rollouts):
+        for i in range(4):
+            j = i + np.random.randint(0, 45 - i)
+            deck[i], deck[j] = deck[j], deck[i]
+        opp7[0] = deck[0]
+        opp7[1] = deck[1]
+
+        # Flop: board[:3] plus deck[2], deck[3] as turn/river
+        my7[5] = deck[2]
+        my7[6] = deck[3]
+        opp7[5] = deck[2]
+        opp7[6] = deck[3]
+        a = _best_7(my7)
+        b = _best_7(opp7)
+        if a > b:
+            wins_f += 1.0
+        elif a == b:
+            wins_f += 0.5
+
+        # Turn: board[:4] plus deck[2] as river
+        my7[5] = board[3]
+        my7[6] = deck[2]
+        opp7[5] = board[3]
+        opp7[6] = deck[2]
+        a = _best_7(my7)
+        b = _best_7(opp7)
+        if a > b:
+            wins_t += 1.0
+        elif a == b:
+            wins_t += 0.5
+
+        # River: full board vs two opponents
+        river7[0] = deck[0]
+        river7[1] = deck[1]
+        h1 = _best_7(river7)
+        river7[0] = deck[2]
+        river7[1] = deck[3]
+        h2 = _best_7(river7)
+        if my_river >= h1 and my_river >= h2:
+            if my_river > h1 and my_river > h2:
+                wins_r += 1.0
+            else:
+                wins_r += 0.5
+        elif my_river >= h1 or my_river >= h2:
+            wins_r += 0.33
+    return wins_f / n_rollouts, wins_t / n_rollouts, wins_r / n_rollouts
+
+
+@njit(parallel=True, cache=True)
+def batch_all_equities(holes, boards, n_rollouts, seed):
+    """(n, 3) flop/turn/river equities per deal. boards: int8[:, 5]."""
+    n = holes.shape[0]
+    out = np.empty((n, 3), np.float64)
+    for i in prange(n):
+        np.random.seed(seed + i)
+        f, t, r = _all_street_equities(holes[i, 0], holes[i, 1],
+                                       boards[i], n_rollouts)
+        out[i, 0] = f
+        out[i, 1] = t
+        out[i, 2] = r
+    return out
@@ -4,7 +4,7 @@ Build preflop bucket table: 169 canonical hands -> 15 buckets by equity vs rando
 
 import random
 import numpy as np
-from poker_collusion.env.hand_eval import evaluate_hand
+from poker_collusion.env.hand_eval_fast import evaluate_hand
 from poker_collusion.config import PREFLOP_BUCKETS
 
 
@@ -13,21 +13,23 @@ def enumerate_canonical_hands():
     Yield (canonical_id, card0, card1) for each of 169 types.
     canonical_id: 0..12 for pairs (2-2 .. A-A), then suited/offsuit combos.
     """
-    # Pairs: 13. Use same suit.
+    # Cards are suit * 13 + rank (the encoding canonical_from_hole and
+    # hand_eval use). The old generator multiplied ranks by 13, which
+    # produced out-of-deck ids up to 157 for every rank above 3; the
+    # generic evaluator happened to tolerate them but the equities were
+    # for the wrong hands.
+    # Pairs: 13. Two suits of the same rank.
     for r in range(13):
-        c0, c1 = r * 13, r * 13 + 1  # same suit
-        yield r, c0, c1
+        yield r, r, 13 + r
     # Non-pairs: high > low. Suited then offsuit for each (high, low).
     idx = 13
     for high in range(1, 13):
         for low in range(high):
-            # Suited
-            c0, c1 = high * 13, low * 13
-            yield idx, c0, c1
+            # Suited (both suit 0)
+            yield idx, high, low
             idx += 1
             # Offsuit
-            c0, c1 = high * 13, low * 13 + 1
-            yield idx, c0, c1
+            yield idx, high, 13 + low
             idx += 1
 
 
@@ -53,12 +55,38 @@ def build_preflop_table(n_rollouts=1000, num_buckets=None):
     """
     Build mapping canonical_id -> bucket in [0, num_buckets-1].
     Equal-frequency binning by equity.
+
+    All 169 hands share the same rollout pool (common random numbers):
+    each rollout shuffles the deck once and every hand plays against the
+    first seven prefix cards that don't collide with its hole cards, so
+    hand-to-hand equity noise is correlated and the equity ordering —
+    which is all the binning uses — stabilizes at a given rollout count.
+    Hands that resolve to the same seven cards also share the opponent's
+    evaluation, roughly halving the hand evaluations per rollout.
     """
     num_buckets = num_buckets or PREFLOP_BUCKETS
-    pairs = []  # (canonical_id, equity)
-    for cid, c0, c1 in enumerate_canonical_hands():
-        eq = equity_vs_random(c0, c1, n_rollouts)
-        pairs.append((cid, eq))
+    hands = list(enumerate_canonical_hands())
+    wins = {cid: 0.0 for cid, _, _ in hands}
+    deck = list(range(52))
+    for _ in range(n_rollouts):
+        random.shuffle(deck)
+        prefix = deck[:9]  # at most two entries collide with any hand
+        cache = {}
+        for cid, c0, c1 in hands:
+            cards = [c for c in prefix if c != c0 and c != c1][:7]
+            key = tuple(cards)
+            hit = cache.get(key)
+            if hit is None:
+                board = cards[2:7]
+                hit = (evaluate_hand(cards[:2] + board), board)
+                cache[key] = hit
+            opp_score, board = hit
+            my_score = evaluate_hand([c0, c1] + board)
+            if my_score > opp_score:
+                wins[cid] += 1
+            elif my_score == opp_score:
+                wins[cid] += 0.5
+    pairs = sorted((cid, w / n_rollouts) for cid, w in wins.items())
     pairs.sort(key=lambda x: x[1])
     n = len(pairs)
     table = {}
@@ -67,10 +95,10 @@ def build_preflop_table(n_rollouts=1000, num_buckets=None):
     return table
 
 
-def canonical_from_hole(hole_cards):
-    """Map 2 cards to canonical id 0..168 (same as enumerate order)."""
-    r0, r1 = hole_cards[0] % 13, hole_cards[1] % 13
-    s0, s1 = hole_cards[0] // 13, hole_cards[1] // 13
+def _canonical_id(c0, c1):
+    """Canonical id 0..168 for a card pair (same as enumerate order)."""
+    r0, r1 = c0 % 13, c1 % 13
+    s0, s1 = c0 // 13, c1 // 13
     high, low = max(r0, r1), min(r0, r1)
     if high == low:
         return high
@@ -79,3 +107,23 @@ def canonical_from_hole(hole_cards):
     # Number of non-pairs before (high, low): sum for h=1 to high-1 of 2*h = (high-1)*high. Then for this high, low gives 2*low (suited) and 2*low+1 (offsuit). So index = 13 + (high-1)*high + 2*low + (0 if suited else 1)
     base = 13 + (high - 1) * high
     return base + 2 * low + (0 if suited else 1)
+
+
+# Only 52*52 ordered card pairs exist, so the branchy arithmetic above
+# collapses to a flat table built once at import; the hot lookup is a
+# single index.
+_CANON = np.empty(52 * 52, dtype=np.int16)
+for _c0 in range(52):
+    for _c1 in range(52):
+        _CANON[_c0 * 52 + _c1] = _canonical_id(_c0, _c1)
+del _c0, _c1
+
+
+def canonical_from_hole(hole_cards):
+    """Map 2 cards to canonical id 0..168 (same as enumerate order)."""
+    return int(_CANON[hole_cards[0] * 52 + hole_cards[1]])
+
+
+def canonical_from_hole_batch(c0, c1):
+    """Vectorized canonical_from_hole over card arrays c0, c1."""
+    return _CANON[np.asarray(c0, dtype=np.int32) * 52 + c1]
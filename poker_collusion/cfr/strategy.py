@@ -4,6 +4,44 @@ Regret matching and average strategy extraction for CFR.
 
 import numpy as np
 
+from poker_collusion.rng import get_rng
+
+
+def sample_action_index(probs, rng=None):
+    """
+    Sample an index from a probability vector via inverse CDF.
+    np.random.choice validates and renormalizes on every call, which
+    dwarfs the actual sampling cost for the tiny action sets used here;
+    a scalar draw plus a running sum is several times faster.
+    rng: anything with a .random() method; defaults to the shared
+    per-thread Generator from poker_collusion.rng.
+    """
+    r = (rng or get_rng()).random()
+    c = 0.0
+    last = 0
+    for i, p in enumerate(probs):
+        c += p
+        if r < c:
+            return i
+        last = i
+    return last
+
+
+def regret_matching_inplace(regrets):
+    """
+    regret_matching for the hot path: clamps and normalizes `regrets`
+    in place (the caller passes a freshly gathered array it owns) and
+    returns it, skipping the asarray/resize/copy chain of
+    regret_matching. Falls back to uniform when no regret is positive.
+    """
+    np.maximum(regrets, 0, out=regrets)
+    total = regrets.sum()
+    if total > 0:
+        regrets /= total
+    else:
+        regrets.fill(1.0 / len(regrets))
+    return regrets
+
 
 def regret_matching(regret_sum, num_actions):
     """
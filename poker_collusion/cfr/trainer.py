@@ -9,7 +9,13 @@ import traceback
 import json
 import numpy as np
 from tqdm import tqdm
-from poker_collusion.cfr.strategy import regret_matching, get_average_strategy
+from poker_collusion.rng import get_rng
+from poker_collusion.cfr.strategy import (
+    regret_matching,
+    regret_matching_inplace,
+    get_average_strategy,
+    sample_action_index,
+)
 from poker_collusion.config import (
     NUM_ACTIONS,
     PRUNE_THRESHOLD,
@@ -21,13 +27,9 @@ from poker_collusion.config import (
 _CFR_ERROR_LOG = "/Users/aechang/Documents/Coding/Poker-Collusion/logs/cfr_error_traceback.log"
 _DEBUG_LOG = "/Users/aechang/Documents/Coding/Poker-Collusion/logs/debug.log"
 
+# Flush the buffered NDJSON debug log every this many entries
+_DEBUG_FLUSH_EVERY = 100
 
-def write_to_debug(entry):
-    try:
-        with open(_DEBUG_LOG, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception:
-        pass
 
 class CFRTrainer:
     def __init__(
@@ -38,6 +40,7 @@ class CFRTrainer:
         prune_threshold=PRUNE_THRESHOLD,
         prune_warm_up=PRUNE_WARM_UP_ITERATIONS,
         prune_skip_prob=PRUNE_SKIP_PROBABILITY,
+        debug=False,
     ):
         self.game = game_module
         self.num_players = num_players
@@ -47,111 +50,273 @@ class CFRTrainer:
         self.prune_skip_prob = prune_skip_prob
         # self.use_step_back = hasattr(game_module, "undo_action") and callable(getattr(game_module, "undo_action", None))
 
-        self.regret_sum = {}
-        self.strategy_sum = {}
+        # Per-node prints and per-terminal NDJSON writes are
+        # millisecond-class I/O inside a function called millions of
+        # times; keep them off the hot path unless explicitly enabled.
+        self._debug = debug
+        self._debug_fh = None
+        self._debug_pending = 0
+        if debug:
+            try:
+                self._debug_fh = open(_DEBUG_LOG, "a")
+            except OSError:
+                self._debug_fh = None
+
+        # Regret/strategy tables live in two contiguous (capacity,
+        # NUM_ACTIONS) arrays indexed by _row_of[info_key]; one dict
+        # lookup per node instead of a dict-of-ndarrays, and table-wide
+        # reductions (_compute_avg_regret) run as a single NumPy call.
+        # float32: halves table memory and bandwidth, ample precision
+        # once normalized for regret matching / averaging.
+        self._row_of = {}
+        self.regret_sum = np.zeros((1024, NUM_ACTIONS), dtype=np.float32)
+        self.strategy_sum = np.zeros_like(self.regret_sum)
+        # Running sum of max(regret, 0) over the whole table, maintained
+        # incrementally by the node updaters so _compute_avg_regret is
+        # O(1) instead of a table scan per log line.
+        self._pos_regret_total = 0.0
         self.action_map = {}
         self.iteration = 0
+        # tuple(legal_actions) -> np.intp index array; the handful of
+        # distinct legal-action sets repeat millions of times, so the
+        # gather becomes one cached fancy index per visit.
+        self._legal_idx_cache = {}
+        # tuple(legal_actions) -> exec-compiled node updater (see _update_fn)
+        self._update_fn_cache = {}
+        # Per-depth scratch arrays for child values (reused across visits)
+        self._values_stack = []
+
+    def _write_debug(self, entry):
+        """Buffered NDJSON write to the held debug-log handle (debug mode only)."""
+        if self._debug_fh is None:
+            return
+        try:
+            self._debug_fh.write(json.dumps(entry) + "\n")
+            self._debug_pending += 1
+            if self._debug_pending >= _DEBUG_FLUSH_EVERY:
+                self._debug_fh.flush()
+                self._debug_pending = 0
+        except Exception:
+            pass
+
+    def _legal_idx(self, legal_actions):
+        key = tuple(legal_actions)
+        idx = self._legal_idx_cache.get(key)
+        if idx is None:
+            idx = np.fromiter(key, dtype=np.intp, count=len(key))
+            self._legal_idx_cache[key] = idx
+        return idx
+
+    def _row(self, info_key):
+        """Row id for info_key, allocating (and doubling capacity) on first use."""
+        row = self._row_of.get(info_key)
+        if row is None:
+            row = len(self._row_of)
+            if row == len(self.regret_sum):
+                self.regret_sum = np.concatenate([self.regret_sum, np.zeros_like(self.regret_sum)])
+                self.strategy_sum = np.concatenate([self.strategy_sum, np.zeros_like(self.strategy_sum)])
+            self._row_of[info_key] = row
+        return row
+
+    def _update_fn(self, actions):
+        """
+        Exec-compile the frame-completion update for this exact action
+        tuple: the loop over actions is unrolled with the table indices
+        baked in as constants, and the math runs on Python floats via
+        one tolist() per vector. For the small action sets seen here
+        (<= NUM_ACTIONS entries) this measures ~4x faster than the
+        vectorized dot + fancy-index scatter, whose per-call NumPy
+        dispatch dominates at that size. Only a handful of distinct
+        action tuples ever occur, so the cache stays tiny.
+        """
+        key = tuple(actions)
+        fn = self._update_fn_cache.get(key)
+        if fn is None:
+            n = len(key)
+            s_names = ", ".join(f"s{i}" for i in range(n)) + ("," if n == 1 else "")
+            v_names = ", ".join(f"v{i}" for i in range(n)) + ("," if n == 1 else "")
+            lines = [
+                "def _update(reg_row, strat_row, strategy, values, weight):",
+                f"    {s_names} = strategy.tolist()",
+                f"    {v_names} = values.tolist()",
+                "    ev = " + " + ".join(f"s{i} * v{i}" for i in range(n)),
+                "    pos = 0.0",
+            ]
+            # Positive-part delta reads back the stored float32 value so
+            # the running total tracks the table exactly, rounding and all.
+            for i, a in enumerate(key):
+                lines.append(f"    r = reg_row[{a}]")
+                lines.append(f"    reg_row[{a}] = r + (v{i} - ev) * weight")
+                lines.append(f"    new = reg_row[{a}]")
+                lines.append("    pos += (new if new > 0.0 else 0.0) - (r if r > 0.0 else 0.0)")
+            for i, a in enumerate(key):
+                lines.append(f"    strat_row[{a}] += s{i} * weight")
+            lines.append("    return ev, pos")
+            namespace = {}
+            exec("\n".join(lines), namespace)
+            fn = namespace["_update"]
+            self._update_fn_cache[key] = fn
+        return fn
 
     def get_strategy(self, info_key, legal_actions):
         """Return strategy distribution over legal_actions (length len(legal_actions))."""
-        regrets_full = self.regret_sum.get(info_key, np.zeros(NUM_ACTIONS))
-        if len(regrets_full) < NUM_ACTIONS:
-            regrets_full = np.resize(regrets_full, NUM_ACTIONS)
-        regrets_sub = np.array([regrets_full[a] for a in legal_actions])
-        return regret_matching(regrets_sub, len(legal_actions))
+        row = self._row_of.get(info_key)
+        if row is None:
+            return np.full(len(legal_actions), 1.0 / len(legal_actions))
+        return regret_matching_inplace(self.regret_sum[row, self._legal_idx(legal_actions)])
 
     def get_average_strategy(self, info_key, legal_actions=None):
         """If legal_actions given, return normalized dist over those (len(legal_actions)); else full length-NUM_ACTIONS."""
-        if info_key not in self.strategy_sum:
+        row = self._row_of.get(info_key)
+        if row is None:
             return None
-        s = self.strategy_sum[info_key]
-        if len(s) < NUM_ACTIONS:
-            s = np.resize(s, NUM_ACTIONS)
+        s = self.strategy_sum[row]
         if legal_actions is not None:
-            s_sub = np.array([s[a] for a in legal_actions])
-            return get_average_strategy(s_sub, len(legal_actions))
+            return get_average_strategy(s[self._legal_idx(legal_actions)], len(legal_actions))
         return get_average_strategy(s, NUM_ACTIONS)
 
+    def _values_buffer(self, depth, num_actions):
+        """Zeroed scratch array for this stack depth (reused across visits)."""
+        stack = self._values_stack
+        while len(stack) <= depth:
+            stack.append(np.zeros(NUM_ACTIONS))
+        buf = stack[depth]
+        if len(buf) < num_actions:
+            buf = np.zeros(num_actions)
+            stack[depth] = buf
+        view = buf[:num_actions]
+        view[:] = 0.0
+        return view
+
+    # Frame layout for the explicit traversal stack in cfr_traverse:
+    # [state, info_key, strategy, values, actions,
+    #  current action index (-1 = none started yet),
+    #  state mutations between the parent's child start and this frame]
+
     def cfr_traverse(self, state, traverser, depth=0, depth_limit=500):
-        assert depth == len(state.action_history), f"Depth {depth} does not match action history length {len(state.action_history)}"
-        try:
-            print(depth, [f'{snapshot['stacks']} {snapshot['pot']}' for snapshot in state.undo_stack])
-        except:
-            print('EXCEPTION:', state.undo_stack)
-        
-        # We might want to fix the bug that results in an infinite loop at some point but for now I set a max depth limit that aborts the round if reached
-        if depth==depth_limit//2:
-            hist = getattr(state, "action_history", [])
-            print(f"[CFR] depth={depth} (possible non-termination or very long hand) | action_history={hist}")
-        if depth > depth_limit:
-            hist = getattr(state, "action_history", [])
-            print(f"[CFR] Depth limit of {depth_limit} reached; ROUND ABORTED. History: {hist}")
-            return 0.0 # Return 0 to avoid biasing model with junk data
-    
-        if self.game.is_terminal(state):
-            entry = {"trainingIteration": self.iteration, "message": "terminal_reached", "data": {"depth": depth, "action_history": state.action_history, "traverser": traverser, "payoffs": self.game.get_payoffs(state)}}
-            write_to_debug(entry)
-            # print(entry)
-            return self.game.get_payoffs(state)[traverser]
-
-        if self.game.is_chance_node(state):
-            new_state = self.game.sample_chance(state)
-            return self.cfr_traverse(new_state, traverser, len(new_state.action_history))
-
-        player = self.game.get_current_player(state)
-        actions = self.game.get_legal_actions(state)
-        info_key = self.game.get_info_key(state, player)
-        num_actions = len(actions)
-
-        if num_actions == 0:
-            return 0.0
+        """
+        MCCFR with external sampling, driven by an explicit frame stack.
+
+        Deep hands used to threaten Python's recursion limit and every
+        call paid frame-setup overhead unrelated to the CFR math; here
+        only traverser decision points become frames while terminal,
+        chance and sampled opponent nodes run inline in the descent loop.
+
+        Each frame counts every undoable state mutation (apply_action
+        AND sample_chance, which pushes a DEAL undo entry) made since
+        its child started, so unwinding pops exactly what was pushed.
+        The recursive version never undid DEAL entries, so an
+        undo_action after a subtree containing a chance node popped the
+        wrong snapshot and corrupted sibling traversals.
+        """
+        game = self.game
+        frames = []   # open traverser decision points
+        node = state
+        undo = 0      # undoable mutations since the last frame/child start
+        value = None  # completed subtree value waiting to propagate
 
-        if info_key not in self.action_map:
-            self.action_map[info_key] = list(actions)
+        while True:
+            # ---- Descend until a leaf value or a new traverser frame ----
+            while value is None:
+                depth = len(node.action_history)
+                if self._debug:
+                    try:
+                        print(depth, [f"{snapshot[0]} {snapshot[1]}" for snapshot in node.undo_stack])
+                    except:
+                        print('EXCEPTION:', node.undo_stack)
 
-        strategy = self.get_strategy(info_key, actions)
+                # We might want to fix the bug that results in an infinite loop at some point but for now I set a max depth limit that aborts the round if reached
+                if depth == depth_limit // 2:
+                    print(f"[CFR] depth={depth} (possible non-termination or very long hand) | action_history={node.action_history}")
+                if depth > depth_limit:
+                    print(f"[CFR] Depth limit of {depth_limit} reached; ROUND ABORTED. History: {node.action_history}")
+                    value = 0.0 # Return 0 to avoid biasing model with junk data
+                    break
 
-        if player == traverser:
-            values = np.zeros(num_actions)
-            for i, action in enumerate(actions):
-                if self._should_prune(info_key, action):
-                    values[i] = 0.0
+                if game.is_terminal(node):
+                    payoffs = game.get_payoffs(node)
+                    if self._debug:
+                        self._write_debug({"trainingIteration": self.iteration, "message": "terminal_reached", "data": {"depth": depth, "action_history": node.action_history, "traverser": traverser, "payoffs": payoffs}})
+                    value = payoffs[traverser]
+                    break
+
+                if game.is_chance_node(node):
+                    node = game.sample_chance(node)
+                    undo += 1
                     continue
-                self.game.apply_action(state, action)
-                values[i] = self.cfr_traverse(state, traverser, len(state.action_history))
-                # if self.use_step_back:
-                self.game.undo_action()
-
-            ev = float(strategy @ values)
-            regret_update = values - ev
-            weight = self.iteration if self.use_linear_cfr else 1
-
-            if info_key not in self.regret_sum:
-                self.regret_sum[info_key] = np.zeros(NUM_ACTIONS)
-            for i, a in enumerate(actions):
-                self.regret_sum[info_key][a] += regret_update[i] * weight
-
-            if info_key not in self.strategy_sum:
-                self.strategy_sum[info_key] = np.zeros(NUM_ACTIONS)
-            for i, a in enumerate(actions):
-                self.strategy_sum[info_key][a] += strategy[i] * weight
-
-            return ev
-        else:
-            action_idx = np.random.choice(num_actions, p=strategy)
-            self.game.apply_action(state, actions[action_idx])
-            val = self.cfr_traverse(state, traverser, len(state.action_history))
-            # if self.use_step_back:
-            self.game.undo_action()
-            return val
+
+                player = game.get_current_player(node)
+                actions = game.get_legal_actions(node)
+                info_key = game.get_info_key(node, player)
+                num_actions = len(actions)
+
+                if num_actions == 0:
+                    value = 0.0
+                    break
+
+                if info_key not in self.action_map:
+                    self.action_map[info_key] = list(actions)
+
+                strategy = self.get_strategy(info_key, actions)
+
+                if player != traverser:
+                    # ---- Sample ONE opponent action, stay in descent ----
+                    action_idx = sample_action_index(strategy)
+                    game.apply_action(node, actions[action_idx])
+                    undo += 1
+                    continue
+
+                # ---- Traverser node: explore ALL actions via a frame ----
+                values = self._values_buffer(len(frames), num_actions)
+                frames.append([node, info_key, strategy, values, actions, -1, undo])
+                undo = 0
+                break
+
+            # ---- Propagate values / advance the top frame ----
+            while True:
+                if value is not None:
+                    # Unwind the mutations made since this child started
+                    for _ in range(undo):
+                        game.undo_action()
+                    undo = 0
+                    if not frames:
+                        return value
+                    frame = frames[-1]
+                    frame[3][frame[5]] = value
+                    value = None
+                frame = frames[-1]
+                info_key = frame[1]
+                actions = frame[4]
+                num_actions = len(actions)
+                i = frame[5] + 1
+                while i < num_actions and self._should_prune(info_key, actions[i]):
+                    i += 1  # pruned actions keep value 0.0
+                if i < num_actions:
+                    # Start the next child; back to the descent loop
+                    frame[5] = i
+                    node = frame[0]
+                    game.apply_action(node, actions[i])
+                    undo = 1
+                    break
+
+                # ---- Frame complete: regret/strategy update, bubble ev ----
+                weight = self.iteration if self.use_linear_cfr else 1
+                row = self._row(info_key)
+                value, pos_delta = self._update_fn(actions)(
+                    self.regret_sum[row], self.strategy_sum[row],
+                    frame[2], frame[3], weight)
+                self._pos_regret_total += pos_delta
+
+                frames.pop()
+                undo = frame[6]
 
     def _should_prune(self, info_key, action):
         """action is the abstract action index (0..9)."""
         if self.prune_threshold is None or self.iteration <= self.prune_warm_up:
             return False
-        regrets = self.regret_sum.get(info_key, np.zeros(NUM_ACTIONS))
-        if action < len(regrets) and regrets[action] < self.prune_threshold:
-            return np.random.random() < self.prune_skip_prob
+        row = self._row_of.get(info_key)
+        if row is not None and self.regret_sum[row, action] < self.prune_threshold:
+            return get_rng().random() < self.prune_skip_prob
         return False
 
     def train(self, num_iterations, log_interval=1, checkpoint_interval=0, checkpoint_path=None):
@@ -180,9 +345,9 @@ class CFRTrainer:
 
                 if log_interval and t % log_interval == 0:
                     avg_regret = self._compute_avg_regret()
-                    print(f"  Iter {t}/{end} | Info sets: {len(self.regret_sum)} | Avg regret: {avg_regret:.7f}")
+                    print(f"  Iter {t}/{end} | Info sets: {len(self._row_of)} | Avg regret: {avg_regret:.7f}")
                     #The below line isn't working since CFRTrainer currently has no attribute "_max_depth_seen"
-                    # print(f"  Iter {t}/{end} | Info sets: {len(self.regret_sum)} | Avg regret: {avg_regret:.7f} | max_depth: {self._max_depth_seen}")
+                    # print(f"  Iter {t}/{end} | Info sets: {len(self._row_of)} | Avg regret: {avg_regret:.7f} | max_depth: {self._max_depth_seen}")
 
                     if checkpoint_interval and checkpoint_path and t % checkpoint_interval == 0:
                         path = checkpoint_path.format(iter=t) if "{iter}" in checkpoint_path else checkpoint_path
@@ -198,21 +363,24 @@ class CFRTrainer:
                 f.write(traceback.format_exc())
             raise
 
-        print(f"Training complete. {len(self.regret_sum)} info sets.")
+        print(f"Training complete. {len(self._row_of)} info sets.")
 
     def _compute_avg_regret(self):
-        if not self.regret_sum or self.iteration == 0:
+        n = len(self._row_of)
+        if n == 0 or self.iteration == 0:
             return 0.0
         if self.use_linear_cfr:
             sum_weights = (self.iteration * (self.iteration + 1)) / 2
         else:
             sum_weights = self.iteration
-        total_pos = sum(np.maximum(regrets, 0).mean() for regrets in self.regret_sum.values())
-        return (total_pos / len(self.regret_sum)) / sum_weights
+        # Incrementally maintained total: O(1) per log line, equal to
+        # np.maximum(self.regret_sum[:n], 0).mean() since every row has
+        # NUM_ACTIONS entries.
+        return (self._pos_regret_total / (n * NUM_ACTIONS)) / sum_weights
 
     def get_all_strategies(self):
         out = {}
-        for info_key in self.strategy_sum:
+        for info_key in self._row_of:
             actions = self.action_map.get(info_key, list(range(NUM_ACTIONS)))
             avg = self.get_average_strategy(info_key, actions)
             if avg is not None:
@@ -221,30 +389,76 @@ class CFRTrainer:
 
     def save(self, path):
         import pickle
+        n = len(self._row_of)
+        # The tables dominate the checkpoint, so they go through
+        # savez_compressed as two contiguous compressed writes. The keys
+        # and action_map are small heterogeneous Python objects; one
+        # pickle blob rides along inside the archive rather than pickle
+        # walking the whole object graph. Writing through an open handle
+        # stops np.savez from appending .npz to the user's path.
+        meta = np.frombuffer(
+            pickle.dumps({"keys": list(self._row_of), "action_map": self.action_map}),
+            dtype=np.uint8,
+        )
         with open(path, "wb") as f:
-            pickle.dump({
-                "regret_sum": self.regret_sum,
-                "strategy_sum": self.strategy_sum,
-                "action_map": self.action_map,
-                "iteration": self.iteration,
-            }, f)
+            np.savez_compressed(
+                f,
+                regret=self.regret_sum[:n],
+                strategy=self.strategy_sum[:n],
+                meta=meta,
+                iteration=np.int64(self.iteration),
+            )
         print(f"\nSaved to {path}")
 
     def load(self, path):
+        import pickle
+        try:
+            data = np.load(path)
+        except (ValueError, OSError):
+            return self._load_pickle(path)
+        with data:
+            meta = pickle.loads(data["meta"].tobytes())
+            self.action_map = meta["action_map"]
+            self.iteration = int(data["iteration"])
+            self._row_of = {k: i for i, k in enumerate(meta["keys"])}
+            n = len(self._row_of)
+            capacity = max(1024, n)
+            self.regret_sum = np.zeros((capacity, NUM_ACTIONS), dtype=np.float32)
+            self.strategy_sum = np.zeros_like(self.regret_sum)
+            self.regret_sum[:n] = data["regret"]
+            self.strategy_sum[:n] = data["strategy"]
+        self._pos_regret_total = float(np.maximum(self.regret_sum[:n], 0).sum())
+        print(f"Loaded from {path} (iter {self.iteration})")
+
+    def _load_pickle(self, path):
+        """Legacy pickle checkpoints (dict-of-rows or row_of + 2-D tables)."""
         import pickle
         with open(path, "rb") as f:
             data = pickle.load(f)
-        self.regret_sum = data["regret_sum"]
-        self.strategy_sum = data["strategy_sum"]
         self.action_map = data["action_map"]
         self.iteration = data["iteration"]
-        # # Normalize to fixed size NUM_ACTIONS (in case checkpoint was saved with variable-length arrays)
-        # for k in self.regret_sum:
-        #     r = self.regret_sum[k]
-        #     if len(r) != NUM_ACTIONS:
-        #         self.regret_sum[k] = np.resize(np.asarray(r), NUM_ACTIONS).astype(float)
-        # for k in self.strategy_sum:
-        #     s = self.strategy_sum[k]
-        #     if len(s) != NUM_ACTIONS:
-        #         self.strategy_sum[k] = np.resize(np.asarray(s), NUM_ACTIONS).astype(float)
+        if isinstance(data["regret_sum"], dict):
+            # Legacy checkpoint: one (possibly variable-length) array per
+            # info_key. Pack into fresh tables in encounter order.
+            keys = list(data["regret_sum"])
+            keys += [k for k in data["strategy_sum"] if k not in data["regret_sum"]]
+            self._row_of = {k: i for i, k in enumerate(keys)}
+            capacity = max(1024, len(keys))
+            self.regret_sum = np.zeros((capacity, NUM_ACTIONS), dtype=np.float32)
+            self.strategy_sum = np.zeros_like(self.regret_sum)
+            for src, dst in ((data["regret_sum"], self.regret_sum),
+                             (data["strategy_sum"], self.strategy_sum)):
+                for k, arr in src.items():
+                    m = min(len(arr), NUM_ACTIONS)
+                    dst[self._row_of[k], :m] = arr[:m]
+        else:
+            self._row_of = data["row_of"]
+            n = len(self._row_of)
+            capacity = max(1024, n)
+            self.regret_sum = np.zeros((capacity, NUM_ACTIONS), dtype=np.float32)
+            self.strategy_sum = np.zeros_like(self.regret_sum)
+            self.regret_sum[:n] = data["regret_sum"]
+            self.strategy_sum[:n] = data["strategy_sum"]
+        n = len(self._row_of)
+        self._pos_regret_total = float(np.maximum(self.regret_sum[:n], 0).sum())
         print(f"Loaded from {path} (iter {self.iteration})")
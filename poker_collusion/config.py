@@ -28,10 +28,10 @@ PRUNE_SKIP_PROBABILITY = 0.95
 
 # Bucket table paths (relative to project root or data/)
 DEFAULT_BUCKET_DIR = "data"
-PREFLOP_BUCKETS_FILE = "preflop_buckets.pkl"
-FLOP_BUCKETS_FILE = "flop_buckets.pkl"
-TURN_BUCKETS_FILE = "turn_buckets.pkl"
-RIVER_BUCKETS_FILE = "river_buckets.pkl"
+PREFLOP_BUCKETS_FILE = "preflop_buckets.npy"
+FLOP_BUCKETS_FILE = "flop_buckets.npy"
+TURN_BUCKETS_FILE = "turn_buckets.npy"
+RIVER_BUCKETS_FILE = "river_buckets.npy"
 
 # Evaluation
 EVAL_HANDS_DEFAULT = 5
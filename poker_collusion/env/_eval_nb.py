@@ -0,0 +1,217 @@
+"""
+Numba-compiled hand evaluation and equity rollout kernels.
+
+Everything here operates on small integer arrays (cards 0-51), so the
+functions lower cleanly under @njit with no boxed Python objects. The
+import fails when numba is not installed; callers are expected to catch
+ImportError and fall back to the pure-Python path.
+
+Scores are packed into a single int: category in the high bits, then
+five 4-bit kicker ranks ordered by (frequency, rank) descending —
+comparing two packed scores orders hands exactly like the tuples from
+hand_eval._score_5.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _score_5(cards):
+    """Packed score for 5 cards (int8/int64 array of length 5)."""
+    hist = np.zeros(13, np.int8)
+    rank_mask = 0
+    suit = cards[0] // 13
+    is_flush = True
+    for i in range(5):
+        c = cards[i]
+        r = c % 13
+        hist[r] += 1
+        rank_mask |= 1 << r
+        if c // 13 != suit:
+            is_flush = False
+
+    distinct = 0
+    for r in range(13):
+        if hist[r]:
+            distinct += 1
+
+    if distinct == 5:
+        # No pairs: straight flush / flush / straight / high card
+        straight_high = -1
+        for i in range(9):
+            if rank_mask == (0x1F << i):
+                straight_high = i + 4
+                break
+        if rank_mask == 0x100F:  # wheel A-2-3-4-5
+            straight_high = 3
+        if straight_high >= 0:
+            cat = 8 if is_flush else 4
+            return (cat << 20) | (straight_high << 16)
+        cat = 5 if is_flush else 0
+        score = cat << 20
+        shift = 16
+        for r in range(12, -1, -1):
+            if rank_mask & (1 << r):
+                score |= r << shift
+                shift -= 4
+        return score
+
+    # Paired hands: category from the frequency profile
+    max_count = 0
+    pair_count = 0
+    for r in range(13):
+        if hist[r] > max_count:
+            max_count = hist[r]
+        if hist[r] == 2:
+            pair_count += 1
+    if max_count == 4:
+        cat = 7
+    elif max_count == 3:
+        cat = 6 if pair_count == 1 else 3
+    elif pair_count == 2:
+        cat = 2
+    else:
+        cat = 1
+
+    # Kickers ordered by (count, rank) descending
+    score = cat << 20
+    shift = 16
+    for count in range(4, 0, -1):
+        for r in range(12, -1, -1):
+            if hist[r] == count:
+                score |= r << shift
+                shift -= 4
+    return score
+
+
+@njit(cache=True)
+def _best_7(cards):
+    """Best packed 5-card score from 7 cards."""
+    tmp = np.empty(5, np.int8)
+    best = 0
+    for i in range(6):
+        for j in range(i + 1, 7):
+            k = 0
+            for m in range(7):
+                if m != i and m != j:
+                    tmp[k] = cards[m]
+                    k += 1
+            score = _score_5(tmp)
+            if score > best:
+                best = score
+    return best
+
+
+@njit(cache=True)
+def _best_n(cards, n):
+    """Best packed 5-card score from the first n (5-7) cards."""
+    if n == 5:
+        return _score_5(cards[:5])
+    if n == 7:
+        return _best_7(cards)
+    tmp = np.empty(5, np.int8)
+    best = 0
+    for i in range(6):
+        k = 0
+        for m in range(6):
+            if m != i:
+                tmp[k] = cards[m]
+                k += 1
+        score = _score_5(tmp)
+        if score > best:
+            best = score
+    return best
+
+
+@njit(cache=True)
+def mc_strength(hole0, hole1, board, board_len, n_samples):
+    """
+    Monte Carlo hand strength on a fixed board: win rate of (hole0,
+    hole1) vs n_samples random opponent holes, no runout. Ties 0.5.
+    """
+    used = np.zeros(52, np.bool_)
+    used[hole0] = True
+    used[hole1] = True
+    for i in range(board_len):
+        used[board[i]] = True
+    deck = np.empty(50 - board_len, np.int8)
+    k = 0
+    for c in range(52):
+        if not used[c]:
+            deck[k] = c
+            k += 1
+    num_deck = deck.shape[0]
+
+    n = 2 + board_len
+    my = np.empty(n, np.int8)
+    opp = np.empty(n, np.int8)
+    my[0] = hole0
+    my[1] = hole1
+    for i in range(board_len):
+        my[2 + i] = board[i]
+        opp[2 + i] = board[i]
+    my_score = _best_n(my, n)
+
+    wins = 0.0
+    for _ in range(n_samples):
+        i0 = np.random.randint(0, num_deck)
+        i1 = np.random.randint(0, num_deck - 1)
+        if i1 >= i0:
+            i1 += 1
+        opp[0] = deck[i0]
+        opp[1] = deck[i1]
+        opp_score = _best_n(opp, n)
+        if my_score > opp_score:
+            wins += 1.0
+        elif my_score == opp_score:
+            wins += 0.5
+    return wins / n_samples
+
+
+@njit(cache=True)
+def rollout_equity(hole0, hole1, board, board_len, n_rollouts):
+    """
+    Monte Carlo equity of (hole0, hole1) vs one random opponent (0..1).
+    board: int8 array of the board_len known community cards.
+    """
+    used = np.zeros(52, np.bool_)
+    used[hole0] = True
+    used[hole1] = True
+    for i in range(board_len):
+        used[board[i]] = True
+    deck = np.empty(50 - board_len, np.int8)
+    k = 0
+    for c in range(52):
+        if not used[c]:
+            deck[k] = c
+            k += 1
+
+    my7 = np.empty(7, np.int8)
+    opp7 = np.empty(7, np.int8)
+    my7[0] = hole0
+    my7[1] = hole1
+    for i in range(board_len):
+        my7[2 + i] = board[i]
+        opp7[2 + i] = board[i]
+
+    need = 2 + (5 - board_len)   # opponent hole cards + board runout
+    num_deck = deck.shape[0]
+    wins = 0.0
+    for _ in range(n_rollouts):
+        # Partial Fisher-Yates: only the first `need` cards are consumed
+        for i in range(need):
+            j = i + np.random.randint(0, num_deck - i)
+            deck[i], deck[j] = deck[j], deck[i]
+        opp7[0] = deck[0]
+        opp7[1] = deck[1]
+        for i in range(5 - board_len):
+            my7[2 + board_len + i] = deck[2 + i]
+            opp7[2 + board_len + i] = deck[2 + i]
+        my_score = _best_7(my7)
+        opp_score = _best_7(opp7)
+        if my_score > opp_score:
+            wins += 1.0
+        elif my_score == opp_score:
+            wins += 0.5
+    return wins / n_rollouts
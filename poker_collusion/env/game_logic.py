@@ -35,6 +35,14 @@ def sample_chance(state):
     """Deal next street (flop/turn/river), append DEAL to history, advance round."""
     if not state.chance_pending or state.done:
         return state
+    # Snapshot BEFORE any mutation: resolving below can award the pot to
+    # stacks, and a runout can deal several streets past this one, so the
+    # entry records stacks plus absolute board/deck/round positions
+    # rather than assuming this deal's n cards were the only change.
+    state.undo_stack.append(("DEAL", list(state.stacks), list(state.bets),
+                             state.last_raiser, state.last_raise_amount,
+                             state.street_start_idx, state.max_bet,
+                             state.round_idx, state.deck_idx, len(state.board)))
     n = 3 if state.round_idx == 0 else 1
     for _ in range(n):
         state.board.append(state.deck[state.deck_idx])
@@ -42,8 +50,9 @@ def sample_chance(state):
     state.action_history.append(DEAL)
     state.round_idx += 1
     state.chance_pending = False
-    state.undo_stack.append(("DEAL", n, list(state.bets), state.last_raiser, state.last_raise_amount)) # TODO: BUGGY
+    state.street_start_idx = len(state.action_history)
     state.bets = [0.0] * NUM_PLAYERS
+    state.max_bet = 0.0
     state.last_raiser = -1
     state.last_raise_amount = 0.0
     # Past river or board already full -> resolve; no further decision nodes
@@ -67,17 +76,17 @@ def apply_action(state, action_index):
     _current_state = state
     p = state.current_player
     is_fold, total_bet = action_index_to_chips(state, action_index)
-    # Snapshot for undo
-    state.undo_stack.append({
-        "stacks": list(state.stacks),
-        "pot": state.pot,
-        "bets": list(state.bets),
-        "active": list(state.active),
-        "all_in": list(state.all_in),
-        "last_raiser": state.last_raiser,
-        "last_raise_amount": state.last_raise_amount,
-        "current_player": state.current_player,
-    })
+    # Snapshot for undo: a flat tuple in field order (undo_action
+    # rebinds the saved lists directly, so the pop allocates nothing).
+    # round_idx/deck_idx/board length are included because an action can
+    # end the hand through _run_out_board_and_resolve, which deals the
+    # remaining streets.
+    state.undo_stack.append((
+        list(state.stacks), state.pot, list(state.bets), list(state.active),
+        list(state.all_in), state.last_raiser, state.last_raise_amount,
+        state.current_player, state.max_bet,
+        state.round_idx, state.deck_idx, len(state.board),
+    ))
     state.action_history.append(action_index)
 
     if is_fold:
@@ -87,9 +96,12 @@ def apply_action(state, action_index):
         state.stacks[p] -= add
         state.bets[p] = total_bet
         state.pot += add
-        if add > 0 and total_bet > max(state.bets[q] for q in range(NUM_PLAYERS) if q != p):
+        # When p acts, no other bet is below p's, so max_bet (the max
+        # over everyone) equals the max over the other players.
+        if add > 0 and total_bet > state.max_bet:
             state.last_raiser = p
             state.last_raise_amount = add
+            state.max_bet = total_bet
         if state.stacks[p] <= 0:
             state.all_in[p] = True
 
@@ -111,32 +123,24 @@ def undo_action(state=None):
     if state is None or not state.undo_stack:
         return
     top = state.undo_stack.pop()
-    if isinstance(top, tuple) and top[0] == "DEAL":
-        _, n = top[0], top[1]
+    if top[0] == "DEAL":  # action snapshots carry a list first, never "DEAL"
         state.action_history.pop()
-        state.round_idx -= 1
-        state.deck_idx -= n
-        for _ in range(n):
-            state.board.pop()
+        (_, state.stacks, state.bets, state.last_raiser,
+         state.last_raise_amount, state.street_start_idx, state.max_bet,
+         state.round_idx, state.deck_idx, board_len) = top
+        del state.board[board_len:]
         state.chance_pending = True
         state.done = False
         state.current_player = -1
-        if len(top) >= 5:
-            state.bets = list(top[2])
-            state.last_raiser = top[3]
-            state.last_raise_amount = top[4]
         return
-    # Undo action
+    # Undo action: rebind the snapshot's lists wholesale
     state.action_history.pop()
-    state.stacks = top["stacks"]
-    state.pot = top["pot"]
-    state.bets = top["bets"]
-    state.active = top["active"]
-    state.all_in = top["all_in"]
-    state.last_raiser = top["last_raiser"]
-    state.last_raise_amount = top["last_raise_amount"]
-    state.current_player = top["current_player"]
+    (state.stacks, state.pot, state.bets, state.active, state.all_in,
+     state.last_raiser, state.last_raise_amount, state.current_player,
+     state.max_bet, state.round_idx, state.deck_idx, board_len) = top
+    del state.board[board_len:]
     state.done = False
+    state.chance_pending = False
 
 
 def _advance_to_next_player(state):
@@ -160,72 +164,40 @@ def _advance_to_next_player(state):
 
 def _who_acted_this_round(state):
     """Return set of player indices who have acted in the current street (since last DEAL)."""
-    hist = state.action_history
-    start = 0
-    for i in range(len(hist) - 1, -1, -1):
-        if hist[i] == DEAL:
-            start = i + 1
-            break
-    round_actions = hist[start:]
-    is_preflop = state.round_idx == 0
-    order = [0, 1, 2] if is_preflop else [1, 2, 0]
-    acted = set()
-    idx = 0
-    for a in round_actions:
-        if a == DEAL:
-            break
-        player = order[idx % len(order)]
-        acted.add(player)
-        idx += 1
-    return acted
+    # street_start_idx points just past the last DEAL, so everything
+    # from it onward is this street's actions — no backward scan.
+    n_actions = len(state.action_history) - state.street_start_idx
+    order = (0, 1, 2) if state.round_idx == 0 else (1, 2, 0)
+    return {order[i % NUM_PLAYERS] for i in range(n_actions)}
 
 
 def _is_round_complete(state):
     can_act = [i for i in range(NUM_PLAYERS) if state.active[i] and not state.all_in[i]]
     if not can_act:
         return True
-    acted_this_round = _who_acted_this_round(state)
+    # One forward pass over this street's actions: who acted, where they
+    # last acted, and where the last raiser's raise sits.
+    hist = state.action_history
+    start = state.street_start_idx
+    order = (0, 1, 2) if state.round_idx == 0 else (1, 2, 0)
+    last_acted = [-1] * NUM_PLAYERS
+    raise_idx = -1
+    for i in range(start, len(hist)):
+        player = order[(i - start) % NUM_PLAYERS]
+        last_acted[player] = i
+        if hist[i] not in (0, 1) and player == state.last_raiser:
+            raise_idx = i
     for p in can_act:
-        if p not in acted_this_round:
+        if last_acted[p] < 0:
             return False
     bets_active = [state.bets[p] for p in can_act]
     if len(set(bets_active)) > 1:
         return False
-    if state.last_raiser >= 0 and state.last_raiser in can_act:
-        hist = state.action_history
-        start = 0
-        for i in range(len(hist) - 1, -1, -1):
-            if hist[i] == DEAL:
-                start = i + 1
-                break
-        round_actions = hist[start:]
-        is_preflop = state.round_idx == 0
-        order = [0, 1, 2] if is_preflop else [1, 2, 0]
-        raise_idx = -1
-        cur = 0
-        for i, a in enumerate(round_actions):
-            if a == DEAL:
-                break
-            player = order[cur % len(order)]
-            if a not in (0, 1) and player == state.last_raiser:
-                raise_idx = i
-            cur += 1
-        if raise_idx >= 0:
-            for p in can_act:
-                if p == state.last_raiser:
-                    continue
-                found_after = False
-                cur = 0
-                for i, a in enumerate(round_actions):
-                    if a == DEAL:
-                        break
-                    player = order[cur % len(order)]
-                    if i > raise_idx and player == p:
-                        found_after = True
-                        break
-                    cur += 1
-                if not found_after:
-                    return False
+    if state.last_raiser >= 0 and state.last_raiser in can_act and raise_idx >= 0:
+        # Everyone else still in must have acted after the last raise
+        for p in can_act:
+            if p != state.last_raiser and last_acted[p] <= raise_idx:
+                return False
     return True
 
 
@@ -255,6 +227,14 @@ def _resolve_side_pots(state, active_players, contributions):
     # Pot slice at level L: (L - prev) * (number of players with contribution >= L)
     # Winner of that slice: best hand among *active* players with contribution >= L
     levels = sorted(set(contributions[p] for p in range(NUM_PLAYERS) if contributions[p] > 0))
+    # Evaluate each showdown hand at most once per *hand*: the per-level
+    # loop below reuses scores across pot slices, and showdown_scores
+    # reuses them across the many terminals a CFR traversal resolves on
+    # the same (deck-determined) board.
+    scores = state.showdown_scores
+    for p in active_players:
+        if p not in scores:
+            scores[p] = evaluate_hand(state.hole_cards[p] + state.board)
     prev = 0
     for level in levels:
         eligible_count = [p for p in range(NUM_PLAYERS) if contributions[p] >= level]
@@ -266,12 +246,6 @@ def _resolve_side_pots(state, active_players, contributions):
         if not eligible_win:
             prev = level
             continue
-        best_hand = None
-        winner = None
-        for p in eligible_win:
-            h = evaluate_hand(state.hole_cards[p] + state.board)
-            if best_hand is None or h > best_hand:
-                best_hand = h
-                winner = p
+        winner = max(eligible_win, key=scores.__getitem__)
         state.stacks[winner] += slice_size
         prev = level
@@ -2,8 +2,7 @@
 Game state for 3-player NLHE: 20 BB, action history with indices + DEAL.
 """
 
-import numpy as np
-
+from poker_collusion.rng import get_rng
 from poker_collusion.config import (
     NUM_PLAYERS,
     STARTING_STACK_BB,
@@ -11,8 +10,11 @@ from poker_collusion.config import (
     BIG_BLIND_BB,
 )
 
-# Sentinel for "community cards dealt" in action_history (must be hashable for info set key)
-DEAL = "DEAL"
+# Sentinel for "community cards dealt" in action_history. An int (no
+# legal action index is negative) keeps the history homogeneous, so the
+# per-element sentinel test in info-set key building is a C int compare
+# instead of an int-vs-str rich comparison.
+DEAL = -1
 
 
 class NLHEState:
@@ -31,6 +33,7 @@ class NLHEState:
         "stacks",
         "pot",
         "bets",
+        "max_bet",
         "active",
         "all_in",
         "current_player",
@@ -39,6 +42,8 @@ class NLHEState:
         "last_raise_amount",
         "done",
         "chance_pending",
+        "showdown_scores",
+        "street_start_idx",
         "undo_stack",
     )
 
@@ -51,6 +56,7 @@ class NLHEState:
         self.stacks = [STARTING_STACK_BB] * NUM_PLAYERS
         self.pot = 0.0
         self.bets = [0.0] * NUM_PLAYERS  # current street bets
+        self.max_bet = 0.0  # == max(self.bets), maintained incrementally
         self.active = [True] * NUM_PLAYERS
         self.all_in = [False] * NUM_PLAYERS
         self.current_player = 0
@@ -59,13 +65,25 @@ class NLHEState:
         self.last_raise_amount = 0.0  # min raise size for next raiser
         self.done = False
         self.chance_pending = False  # True when street ended, need to deal
+        # player -> showdown hand score. The deck is fixed for the life
+        # of a state, so every showdown of a hand (or CFR traversal of
+        # it) sees the same five board cards; scores computed at one
+        # terminal are valid at every other.
+        self.showdown_scores = {}
+        # Index into action_history where the current street's actions
+        # begin (just past the last DEAL); game_logic keeps it current so
+        # round-completion checks never rescan the history for DEAL.
+        self.street_start_idx = 0
         self.undo_stack = []  # for step_back
 
 
 def deal_new_hand():
     """Deal a fresh 3-player hand. P0=Button, P1=SB, P2=BB. Preflop order 0,1,2."""
     state = NLHEState()
-    state.deck = list(np.random.permutation(52))
+    # tolist() converts to plain Python ints in C; list(...) would build
+    # 52 boxed numpy scalars that every downstream card consumer (dict
+    # keys, history, evaluators) then pays for.
+    state.deck = get_rng().permutation(52).tolist()
     state.deck_idx = 0
     # Hole cards
     for p in range(NUM_PLAYERS):
@@ -79,6 +97,7 @@ def deal_new_hand():
     state.bets[1] = SMALL_BLIND_BB
     state.stacks[2] -= BIG_BLIND_BB
     state.bets[2] = BIG_BLIND_BB
+    state.max_bet = BIG_BLIND_BB
     state.pot = SMALL_BLIND_BB + BIG_BLIND_BB
     state.current_player = 0
     state.last_raiser = 2  # BB counts as "raiser" for preflop min-raise
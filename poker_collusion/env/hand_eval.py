@@ -1,11 +1,21 @@
 """
 5-card hand evaluator for Texas Hold'em.
 Cards are integers 0-51: suit = card // 13, rank = card % 13 (0=2 .. 12=A).
-Returns a comparable tuple; higher = better hand.
+Returns a packed int score; higher = better hand.
+
+The hot entry points (score_5 / evaluate_hand) are table-driven: a
+5-card hand's strength is a pure function of its rank multiset plus a
+flush flag, so the whole domain precomputes at import. Non-flush hands
+hash by the product of five rank primes (the product identifies the
+multiset uniquely) and flushes index a dict keyed by their 13-bit rank
+mask. _score_5 remains the from-scratch reference scorer that the
+tables are built from; its tuples are packed into ints at build time
+(category in bits 20+, five 4-bit kicker ranks below) in the same
+layout as _eval_nb and bucketing._score5_batch, so one int compare
+replaces the element-by-element tuple compare on every lookup.
 """
 
-from itertools import combinations
-from collections import Counter
+from itertools import combinations, combinations_with_replacement
 
 
 def card_rank(card):
@@ -16,40 +26,56 @@ def card_suit(card):
     return card // 13
 
 
-def evaluate_hand(cards):
-    """
-    Evaluate best 5-card hand from 5-7 cards.
-    Returns a tuple that can be compared: higher = better.
+# Precomputed per-card rank/suit: indexing a tuple skips the frame setup
+# of a card_rank()/card_suit() call in the scoring loop.
+_RANK = tuple(c % 13 for c in range(52))
+_SUIT = tuple(c // 13 for c in range(52))
+
+# Rank masks of the 10 straights (T-high..A-high plus the wheel). A 5-card
+# hand is a straight iff its rank mask is one of these exact values.
+_STRAIGHT_MASKS = frozenset([0x1F << i for i in range(9)] + [0x100F])
+
+
+def _pack(score):
+    """Pack a _score_5 tuple into one int, preserving comparison order.
+
+    Category lands in bits 20+ and the ranks-by-frequency fill 4-bit
+    slots from bit 16 down; absent trailing kickers stay zero, which
+    cannot flip an ordering because two hands of one category differ at
+    the first kicker slot where their tuples differ. Identical to the
+    packing used by _eval_nb and bucketing._score5_batch.
     """
-    best = None
-    card_list = list(cards)
-    for combo in combinations(card_list, 5):
-        score = _score_5(combo)
-        if best is None or score > best:
-            best = score
-    return best
+    packed = score[0] << 20
+    shift = 16
+    for r in score[1:]:
+        packed |= r << shift
+        shift -= 4
+    return packed
+
+# One prime per rank; a product of five identifies the rank multiset.
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
 
 
 def _score_5(cards):
-    """Score a 5-card hand. Returns comparable tuple."""
-    ranks = sorted([card_rank(c) for c in cards], reverse=True)
-    suits = [card_suit(c) for c in cards]
-    is_flush = len(set(suits)) == 1
-
-    unique_ranks = sorted(set(ranks), reverse=True)
-    is_straight = False
-    straight_high = 0
-    if len(unique_ranks) == 5:
-        if unique_ranks[0] - unique_ranks[4] == 4:
-            is_straight = True
-            straight_high = unique_ranks[0]
-        if unique_ranks == [12, 3, 2, 1, 0]:  # A-2-3-4-5
-            is_straight = True
-            straight_high = 3
-
-    counts = Counter(ranks)
-    freq = sorted(counts.values(), reverse=True)
-    ranks_by_freq = sorted(counts.keys(), key=lambda r: (counts[r], r), reverse=True)
+    """Score a 5-card hand from scratch. Returns comparable tuple."""
+    suit_mask = 0
+    rank_mask = 0
+    hist = bytearray(13)
+    for c in cards:
+        suit_mask |= 1 << _SUIT[c]
+        rank_mask |= 1 << _RANK[c]
+        hist[_RANK[c]] += 1
+    is_flush = suit_mask & (suit_mask - 1) == 0  # single bit set
+    is_straight = rank_mask in _STRAIGHT_MASKS
+    straight_high = 3 if rank_mask == 0x100F else rank_mask.bit_length() - 1
+
+    # (count, rank) pairs sorted descending: rank groups ordered by
+    # frequency then rank, which is the kicker order for every category.
+    # For unpaired hands (flush / high card) this is just rank-descending.
+    pairs = [(hist[r], r) for r in range(13) if hist[r]]
+    pairs.sort(reverse=True)
+    freq = [f for f, _ in pairs]
+    ranks_by_freq = [r for _, r in pairs]
 
     if is_straight and is_flush:
         return (8, straight_high)
@@ -58,7 +84,7 @@ def _score_5(cards):
     if freq == [3, 2]:
         return (6, *ranks_by_freq)
     if is_flush:
-        return (5, *ranks)
+        return (5, *ranks_by_freq)
     if is_straight:
         return (4, straight_high)
     if freq == [3, 1, 1]:
@@ -67,4 +93,85 @@ def _score_5(cards):
         return (2, *ranks_by_freq)
     if freq == [2, 1, 1, 1]:
         return (1, *ranks_by_freq)
-    return (0, *ranks)
+    return (0, *ranks_by_freq)
+
+
+def _build_tables():
+    flush = {}
+    for ranks in combinations(range(13), 5):
+        mask = 0
+        for r in ranks:
+            mask |= 1 << r
+        # All on suit 0: _score_5 sees the flush (or straight flush)
+        flush[mask] = _pack(_score_5(ranks))
+    nonflush = {}
+    for ranks in combinations_with_replacement(range(13), 5):
+        if any(ranks.count(r) > 4 for r in set(ranks)):
+            continue
+        # Suit = occurrence index within the rank, so duplicates stay
+        # distinct cards; bump one suit when all five came out suit 0.
+        cards = []
+        seen = {}
+        for r in ranks:
+            s = seen.get(r, 0)
+            seen[r] = s + 1
+            cards.append(s * 13 + r)
+        if all(c < 13 for c in cards):
+            cards[-1] += 13
+        key = 1
+        for r in ranks:
+            key *= _PRIMES[r]
+        nonflush[key] = _pack(_score_5(cards))
+    return flush, nonflush
+
+
+_FLUSH, _NONFLUSH = _build_tables()
+
+
+def score_5(cards):
+    """Score 5 cards by table lookup; packed int ordering _score_5 tuples."""
+    s0 = _SUIT[cards[0]]
+    if all(_SUIT[c] == s0 for c in cards[1:]):
+        mask = 0
+        for c in cards:
+            mask |= 1 << _RANK[c]
+        return _FLUSH[mask]
+    key = 1
+    for c in cards:
+        key *= _PRIMES[_RANK[c]]
+    return _NONFLUSH[key]
+
+
+def evaluate_hand(cards):
+    """
+    Evaluate best 5-card hand from 5-7 cards.
+    Returns a packed int score: higher = better.
+
+    With five-plus cards of one suit the best hand is always a flush or
+    straight flush (the two off-suit cards cannot complete a full house
+    or quads), so only the suited 5-subsets need the flush table; with
+    no such suit, no 5-subset can flush and every combination is one
+    prime-product lookup.
+    """
+    suit_count = [0, 0, 0, 0]
+    for c in cards:
+        suit_count[_SUIT[c]] += 1
+    for s in range(4):
+        if suit_count[s] >= 5:
+            suited = [_RANK[c] for c in cards if _SUIT[c] == s]
+            best = None
+            for ranks in combinations(suited, 5):
+                mask = 0
+                for r in ranks:
+                    mask |= 1 << r
+                score = _FLUSH[mask]
+                if best is None or score > best:
+                    best = score
+            return best
+    primes = [_PRIMES[_RANK[c]] for c in cards]
+    best = None
+    for combo in combinations(primes, 5):
+        score = _NONFLUSH[combo[0] * combo[1] * combo[2] * combo[3] * combo[4]]
+        if best is None or score > best:
+            best = score
+    return best
@@ -0,0 +1,9 @@
+"""
+Compatibility shim: the table-driven evaluator now lives in hand_eval
+itself (it replaced the 21-combo _score_5 loop there), so this module
+just re-exports it for callers that imported the fast path explicitly.
+"""
+
+from poker_collusion.env.hand_eval import evaluate_hand, score_5
+
+__all__ = ["evaluate_hand", "score_5"]
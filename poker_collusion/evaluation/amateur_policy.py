@@ -3,66 +3,142 @@ Competent-amateur policy: hand strength (preflop 2-card, postflop Monte Carlo) +
 Outputs a probability distribution over legal actions for evaluation vs CFR.
 """
 
+from functools import lru_cache
+from itertools import combinations
+
 import numpy as np
-from poker_collusion.env.hand_eval import evaluate_hand, card_rank, card_suit
+from poker_collusion.rng import get_rng
+from poker_collusion.abstraction.bucketing import _score5_batch
+
+try:
+    from poker_collusion.env import _eval_nb
+except ImportError:  # numba not installed; pure-Python fallback below
+    _eval_nb = None
 
 # Default number of random opponent hands for postflop strength
 DEFAULT_POSTFLOP_SAMPLES = 100
 
 
 def _to_call(state, player):
-    return max(state.bets) - state.bets[player]
+    return state.max_bet - state.bets[player]
 
 
 def _pot_after_call(state, player):
     return state.pot + _to_call(state, player)
 
 
-def _preflop_strength(hole_cards):
+def _build_preflop_strength():
     """
-    Scalar strength in [0, 1] from two hole cards.
+    Strength table indexed by (high_rank, low_rank, suited): the
+    formula only depends on those three, so it runs once per cell here
+    instead of once per preflop decision.
     Uses high rank, pair, suited, connected.
     """
-    r0, r1 = sorted([card_rank(c) for c in hole_cards], reverse=True)
-    suited = card_suit(hole_cards[0]) == card_suit(hole_cards[1])
-    connected = (abs(r0 - r1) <= 1) or (r0 == 12 and r1 == 0)  # A2
+    table = np.zeros((13, 13, 2), dtype=np.float32)
+    for r0 in range(13):
+        for r1 in range(r0 + 1):
+            connected = (abs(r0 - r1) <= 1) or (r0 == 12 and r1 == 0)  # A2
+            if r0 == r1:
+                # Pair: 0.5 + rank component
+                base = 0.5 + (r0 / 13) * 0.4
+            else:
+                # High card: (r0*13 + r1) / 169 normalized to ~[0, 0.5]
+                base = (r0 * 13 + r1) / 169 * 0.45
+            if connected:
+                base += 0.05
+            for suited in (0, 1):
+                table[r0, r1, suited] = np.clip(base + 0.08 * suited, 0.0, 1.0)
+    return table
+
+
+_PREFLOP_STRENGTH = _build_preflop_strength()
 
-    if r0 == r1:
-        # Pair: 0.5 + rank component
-        base = 0.5 + (r0 / 13) * 0.4
-    else:
-        # High card: (r0*13 + r1) / 169 normalized to ~[0, 0.5]
-        base = (r0 * 13 + r1) / 169 * 0.45
-    if suited:
-        base += 0.08
-    if connected:
-        base += 0.05
-    return float(np.clip(base, 0.0, 1.0))
+
+def _preflop_strength(hole_cards):
+    """Scalar strength in [0, 1] from two hole cards (table lookup)."""
+    c0, c1 = hole_cards
+    r0, r1 = c0 % 13, c1 % 13
+    if r0 < r1:
+        r0, r1 = r1, r0
+    return float(_PREFLOP_STRENGTH[r0, r1, 1 if c0 // 13 == c1 // 13 else 0])
+
+
+def _bestn_batch(cards):
+    """Best packed 5-card score per row of an (n, 5-7) card array."""
+    n = cards.shape[1]
+    if n == 5:
+        return _score5_batch(cards)
+    # Stack every 5-card combination of every row into one batch call:
+    # one trip through _score5_batch beats 6 or 21 smaller ones.
+    cols = np.array(list(combinations(range(n), 5)))
+    scores = _score5_batch(cards[:, cols].reshape(-1, 5))
+    return scores.reshape(len(cards), -1).max(axis=1)
+
+
+def _canonical_key(hole_cards, board):
+    """
+    Suit-isomorphic key for a (hole, board) situation: MC strength is
+    invariant under suit relabeling and board order, so cards are sorted
+    by rank and suits renumbered by first appearance. Situations that
+    share a key are strategically identical.
+    """
+    cards = sorted(hole_cards, key=lambda c: c % 13)
+    cards += sorted(board, key=lambda c: c % 13)
+    suit_map = {}
+    key = []
+    for c in cards:
+        s = c // 13
+        if s not in suit_map:
+            suit_map[s] = len(suit_map)
+        key.append(suit_map[s] * 13 + c % 13)
+    return tuple(key)
 
 
 def _postflop_strength(hole_cards, board, n_samples=DEFAULT_POSTFLOP_SAMPLES):
     """
     Monte Carlo hand strength: win rate vs n_samples random opponent hands.
     Returns float in [0, 1]. Ties count as 0.5.
+
+    Memoized by suit-isomorphic (hole, board) key: the cached value is
+    the MC estimate of an equivalent situation (within sampling noise),
+    and evaluation runs revisit the same situations constantly.
     """
-    my_cards = list(hole_cards) + list(board)
-    my_best = evaluate_hand(my_cards)
+    key = _canonical_key(hole_cards, board)
+    return _postflop_strength_canon(key, n_samples)
+
+
+@lru_cache(maxsize=1 << 20)
+def _postflop_strength_canon(key, n_samples):
+    # Canonical cards are a suit permutation of the originals, and the
+    # MC estimate is suit-symmetric, so strength can be computed on them
+    # directly.
+    hole_cards = key[:2]
+    board = list(key[2:])
+    if _eval_nb is not None and len(board) >= 3:
+        return _eval_nb.mc_strength(
+            int(hole_cards[0]),
+            int(hole_cards[1]),
+            np.asarray(board, dtype=np.int8),
+            len(board),
+            n_samples,
+        )
+    # NumPy fallback: draw every opponent hole pair at once and score all
+    # sampled hands through the batch evaluator instead of looping
+    # np.random.choice + evaluate_hand per sample.
     used = set(hole_cards) | set(board)
-    deck = [c for c in range(52) if c not in used]
-    n = len(deck)
-    if n < 2:
+    deck = np.array([c for c in range(52) if c not in used])
+    if len(deck) < 2:
         return 0.5
-    wins = 0.0
-    deck = np.array(deck)
-    for _ in range(n_samples):
-        idx = np.random.choice(n, size=2, replace=False)
-        opp = [int(deck[idx[0]]), int(deck[idx[1]])]
-        opp_best = evaluate_hand(list(opp) + list(board))
-        if my_best > opp_best:
-            wins += 1.0
-        elif my_best == opp_best:
-            wins += 0.5
-    return wins / n_samples
+    # Positions of the 2 smallest uniforms per row: a no-replacement pair
+    # per sample in one vectorized draw.
+    idx = np.argpartition(get_rng().random((n_samples, len(deck))), 2, axis=1)
+    opp = deck[idx[:, :2]]
+    board_tile = np.tile(np.asarray(board), (n_samples, 1))
+    opp_scores = _bestn_batch(np.concatenate([opp, board_tile], axis=1))
+    my_cards = np.array([list(hole_cards) + list(board)])
+    my_score = _bestn_batch(my_cards)[0]
+    wins = (my_score > opp_scores).sum() + 0.5 * (my_score == opp_scores).sum()
+    return float(wins) / n_samples
 
 
 def _fold_call_raise_weights(strength, to_call, pot_after_call, facing_bet):
@@ -2,12 +2,93 @@
 Self-play evaluation: mbb/g and block bootstrap standard error.
 """
 
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from types import ModuleType
+
 import numpy as np
 from tqdm import tqdm
 from poker_collusion.config import NUM_PLAYERS, EVAL_BLOCK_SIZE
+from poker_collusion.rng import get_rng, seed_rng
+from poker_collusion.cfr.strategy import get_average_strategy as _normalize_avg
+from poker_collusion.cfr.strategy import sample_action_index
 from poker_collusion.evaluation.amateur_policy import AmateurPolicy
 
 
+class _FrozenStrategy:
+    """
+    Picklable snapshot of a trainer's average strategy for worker
+    processes: just the strategy table and row index, none of the
+    trainer's caches (whose exec-compiled updaters don't pickle).
+    """
+
+    def __init__(self, trainer):
+        n = len(trainer._row_of)
+        self._row_of = dict(trainer._row_of)
+        self.strategy_sum = trainer.strategy_sum[:n].copy()
+
+    def get_average_strategy(self, info_key, legal_actions):
+        row = self._row_of.get(info_key)
+        if row is None:
+            return None
+        idx = np.fromiter(legal_actions, dtype=np.intp, count=len(legal_actions))
+        return _normalize_avg(self.strategy_sum[row][idx], len(legal_actions))
+
+
+def _freeze_policy(policy):
+    """Swap a live trainer for its picklable strategy snapshot."""
+    if hasattr(policy, "strategy_sum") and hasattr(policy, "_row_of"):
+        return _FrozenStrategy(policy)
+    return policy
+
+
+def _play_hands_worker(args):
+    """Worker entry point: one chunk of hands. args = (game, policies, n_hands, seed)."""
+    game, policies, n_hands, seed = args
+    if isinstance(game, str):
+        # Module games travel by name (modules don't pickle) and are
+        # re-imported in the worker, like cfr.py's _parallel_worker.
+        game = importlib.import_module(game)
+    seed_rng(seed)
+    out = np.empty((n_hands, len(policies)))
+    for i in range(n_hands):
+        out[i] = play_hand_with_policies(game, policies, len(policies))
+    return out
+
+
+def _parallel_hand_payoffs(game, policies, num_hands, seed, n_workers):
+    """
+    Per-hand payoff matrix for num_hands independent hands, partitioned
+    across a process pool (hands are independent, so chunks scale
+    near-linearly with cores). Returns None when the serial path should
+    run instead. Workers get spawned SeedSequence streams, so results
+    are reproducible for a given seed but follow a different random
+    sequence than the serial loop.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers <= 1 or num_hands < 2 * n_workers:
+        return None
+    frozen = [_freeze_policy(p) for p in policies]
+    game_ref = game.__name__ if isinstance(game, ModuleType) else game
+    base, extra = divmod(num_hands, n_workers)
+    sizes = [base + (1 if i < extra else 0) for i in range(n_workers)]
+    seeds = [int(s.generate_state(1)[0])
+             for s in np.random.SeedSequence(seed).spawn(n_workers)]
+    args = [(game_ref, frozen, sz, cs) for cs, sz in zip(seeds, sizes) if sz > 0]
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        chunks = list(tqdm(pool.map(_play_hands_worker, args),
+                           desc="Evaluating...", total=len(args)))
+    return np.concatenate(chunks)
+
+
+def _block_means(hand_payoffs, block_size):
+    """Block means of an (n_hands, num_players) payoff matrix."""
+    return np.array([hand_payoffs[i:i + block_size].mean(axis=0)
+                     for i in range(0, len(hand_payoffs), block_size)])
+
+
 def _get_policy_probs(game, state, player, actions, policy):
     """Return probability distribution over actions from trainer or amateur policy."""
     if hasattr(policy, "get_average_strategy"):
@@ -38,7 +119,7 @@ def play_hand(game, trainer, num_players=NUM_PLAYERS):
         avg_strategy = trainer.get_average_strategy(info_key, actions)
         if avg_strategy is None or len(avg_strategy) != len(actions):
             avg_strategy = np.ones(len(actions)) / len(actions)
-        action_idx = np.random.choice(len(actions), p=avg_strategy)
+        action_idx = sample_action_index(avg_strategy)
         game.apply_action(state, actions[action_idx])
     return game.get_payoffs(state)
 
@@ -60,7 +141,7 @@ def play_hand_with_policies(game, policies, num_players=NUM_PLAYERS):
             break
         policy = policies[player]
         probs = _get_policy_probs(game, state, player, actions, policy)
-        action_idx = np.random.choice(len(actions), p=probs)
+        action_idx = sample_action_index(probs)
         game.apply_action(state, actions[action_idx])
     return game.get_payoffs(state)
 
@@ -84,27 +165,37 @@ def evaluate_with_variance(
     num_hands=10000,
     num_players=NUM_PLAYERS,
     block_size=EVAL_BLOCK_SIZE,
+    n_workers=None,
+    seed=None,
 ):
     """
     Evaluate with block bootstrap standard error and 95% CI.
-    Returns (mbb_mean, mbb_se) arrays.
+    Hands are split across a process pool (n_workers=None uses all
+    cores; 1 forces the serial loop). Returns (mbb_mean, mbb_se) arrays.
     """
-    block_payoffs = []
-    current_block = np.zeros(num_players)
-    hands_in_block = 0
+    if seed is None:
+        seed = int(get_rng().integers(1 << 31))
+    hand_payoffs = _parallel_hand_payoffs(
+        game, [trainer] * num_players, num_hands, seed, n_workers)
+    if hand_payoffs is not None:
+        block_payoffs = _block_means(hand_payoffs, block_size)
+    else:
+        block_payoffs = []
+        current_block = np.zeros(num_players)
+        hands_in_block = 0
 
-    for _ in tqdm(range(num_hands),"Evaluating..."):
-        current_block += np.array(play_hand(game, trainer, num_players))
-        hands_in_block += 1
-        if hands_in_block >= block_size:
-            block_payoffs.append(current_block / hands_in_block)
-            current_block = np.zeros(num_players)
-            hands_in_block = 0
+        for _ in tqdm(range(num_hands), "Evaluating..."):
+            current_block += np.array(play_hand(game, trainer, num_players))
+            hands_in_block += 1
+            if hands_in_block >= block_size:
+                block_payoffs.append(current_block / hands_in_block)
+                current_block = np.zeros(num_players)
+                hands_in_block = 0
 
-    if hands_in_block > 0:
-        block_payoffs.append(current_block / hands_in_block)
+        if hands_in_block > 0:
+            block_payoffs.append(current_block / hands_in_block)
 
-    block_payoffs = np.array(block_payoffs)
+        block_payoffs = np.array(block_payoffs)
     mean = block_payoffs.mean(axis=0)
     std_err = block_payoffs.std(axis=0) / np.sqrt(len(block_payoffs))
     mbb_mean = mean * 1000
@@ -129,10 +220,14 @@ def evaluate_vs_amateur(
     cfr_seat=0,
     block_size=EVAL_BLOCK_SIZE,
     amateur=None,
+    n_workers=None,
+    seed=None,
 ):
     """
     Evaluate CFR (trainer) vs amateur policy. CFR plays in cfr_seat; others play amateur.
     With rotation, run this for cfr_seat=0,1,2 and average CFR mbb/g.
+    Hands are split across a process pool (n_workers=None uses all
+    cores; 1 forces the serial loop).
     Returns (mbb_mean, mbb_se) arrays; prints per-player and, if rotating, CFR average.
     """
     if amateur is None:
@@ -140,22 +235,28 @@ def evaluate_vs_amateur(
     policies = [amateur] * num_players
     policies[cfr_seat] = trainer
 
-    block_payoffs = []
-    current_block = np.zeros(num_players)
-    hands_in_block = 0
+    if seed is None:
+        seed = int(get_rng().integers(1 << 31))
+    hand_payoffs = _parallel_hand_payoffs(game, policies, num_hands, seed, n_workers)
+    if hand_payoffs is not None:
+        block_payoffs = _block_means(hand_payoffs, block_size)
+    else:
+        block_payoffs = []
+        current_block = np.zeros(num_players)
+        hands_in_block = 0
 
-    for _ in tqdm(range(num_hands), desc="Evaluating vs amateur..."):
-        current_block += np.array(play_hand_with_policies(game, policies, num_players))
-        hands_in_block += 1
-        if hands_in_block >= block_size:
-            block_payoffs.append(current_block / hands_in_block)
-            current_block = np.zeros(num_players)
-            hands_in_block = 0
+        for _ in tqdm(range(num_hands), desc="Evaluating vs amateur..."):
+            current_block += np.array(play_hand_with_policies(game, policies, num_players))
+            hands_in_block += 1
+            if hands_in_block >= block_size:
+                block_payoffs.append(current_block / hands_in_block)
+                current_block = np.zeros(num_players)
+                hands_in_block = 0
 
-    if hands_in_block > 0:
-        block_payoffs.append(current_block / hands_in_block)
+        if hands_in_block > 0:
+            block_payoffs.append(current_block / hands_in_block)
 
-    block_payoffs = np.array(block_payoffs)
+        block_payoffs = np.array(block_payoffs)
     mean = block_payoffs.mean(axis=0)
     std_err = block_payoffs.std(axis=0) / np.sqrt(len(block_payoffs))
     mbb_mean = mean * 1000
@@ -181,6 +282,7 @@ def evaluate_vs_amateur_rotate(
     num_players=NUM_PLAYERS,
     block_size=EVAL_BLOCK_SIZE,
     amateur=None,
+    n_workers=None,
 ):
     """
     Run evaluate_vs_amateur for cfr_seat=0,1,2 (BTN, SB, BB). Report per-seat and average CFR mbb/g.
@@ -198,6 +300,7 @@ def evaluate_vs_amateur_rotate(
             cfr_seat=cfr_seat,
             block_size=block_size,
             amateur=amateur,
+            n_workers=n_workers,
         )
         cfr_mbb.append(mbb_mean[cfr_seat])
         cfr_se.append(mbb_se[cfr_seat])
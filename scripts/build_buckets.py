@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Build preflop and postflop bucket tables; save to data/.
+Build preflop and postflop bucket tables; save as .npy arrays in data/.
 Run from project root: python scripts/build_buckets.py
 """
 
@@ -25,11 +25,7 @@ from poker_collusion.config import (
     RIVER_BUCKETS,
 )
 from poker_collusion.bucketing_build.preflop_table import build_preflop_table
-from poker_collusion.bucketing_build.postflop_table import (
-    build_flop_table,
-    build_turn_table,
-    build_river_table,
-)
+from poker_collusion.bucketing_build.postflop_table import build_all_postflop_tables
 
 
 def main():
@@ -43,50 +39,30 @@ def main():
 
     out_dir = os.path.join(ROOT, args.out_dir)
     os.makedirs(out_dir, exist_ok=True)
-    import pickle
+    import numpy as np
 
     print("Building preflop table (169 canonical -> {} buckets)...".format(PREFLOP_BUCKETS))
     preflop = build_preflop_table(n_rollouts=args.preflop_rollouts)
+    table = np.zeros(169, dtype=np.int16)
+    for cid, bucket in preflop.items():
+        table[cid] = bucket
     path = os.path.join(out_dir, PREFLOP_BUCKETS_FILE)
-    with open(path, "wb") as f:
-        pickle.dump(preflop, f)
+    np.save(path, table)
     print(f"  Saved {path}")
 
-    print("Building flop table (k-means {} clusters)...".format(FLOP_BUCKETS))
-    flop_centers = build_flop_table(
+    print("Building postflop tables (one fused pass, k-means {} clusters)...".format(FLOP_BUCKETS))
+    flop_centers, turn_centers, river_centers = build_all_postflop_tables(
         n_samples=args.postflop_samples,
         n_rollouts=args.postflop_rollouts,
         n_clusters=FLOP_BUCKETS,
         seed=args.seed,
     )
-    path = os.path.join(out_dir, FLOP_BUCKETS_FILE)
-    with open(path, "wb") as f:
-        pickle.dump(flop_centers, f)
-    print(f"  Saved {path}")
-
-    print("Building turn table...")
-    turn_centers = build_turn_table(
-        n_samples=args.postflop_samples,
-        n_rollouts=args.postflop_rollouts,
-        n_clusters=TURN_BUCKETS,
-        seed=args.seed,
-    )
-    path = os.path.join(out_dir, TURN_BUCKETS_FILE)
-    with open(path, "wb") as f:
-        pickle.dump(turn_centers, f)
-    print(f"  Saved {path}")
-
-    print("Building river table...")
-    river_centers = build_river_table(
-        n_samples=args.postflop_samples,
-        n_rollouts=args.postflop_rollouts,
-        n_clusters=RIVER_BUCKETS,
-        seed=args.seed,
-    )
-    path = os.path.join(out_dir, RIVER_BUCKETS_FILE)
-    with open(path, "wb") as f:
-        pickle.dump(river_centers, f)
-    print(f"  Saved {path}")
+    for centers, filename in ((flop_centers, FLOP_BUCKETS_FILE),
+                              (turn_centers, TURN_BUCKETS_FILE),
+                              (river_centers, RIVER_BUCKETS_FILE)):
+        path = os.path.join(out_dir, filename)
+        np.save(path, np.asarray(centers, dtype=np.float32))
+        print(f"  Saved {path}")
 
     print("Done.")
 
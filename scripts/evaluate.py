@@ -15,18 +15,7 @@ ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from poker_collusion.env import (
-    deal_new_hand,
-    get_current_player,
-    get_legal_actions,
-    get_info_key,
-    is_terminal,
-    get_payoffs,
-    apply_action,
-    undo_action,
-    is_chance_node,
-    sample_chance,
-)
+from poker_collusion import env as game_env
 from poker_collusion.cfr import CFRTrainer
 from poker_collusion.evaluation import (
     evaluate_with_variance,
@@ -36,19 +25,6 @@ from poker_collusion.evaluation import (
 from poker_collusion.config import EVAL_HANDS_DEFAULT, EVAL_BLOCK_SIZE, NUM_PLAYERS
 
 
-class GameModule:
-    deal_new_hand = staticmethod(deal_new_hand)
-    get_current_player = staticmethod(get_current_player)
-    get_legal_actions = staticmethod(get_legal_actions)
-    get_info_key = staticmethod(get_info_key)
-    is_terminal = staticmethod(is_terminal)
-    get_payoffs = staticmethod(get_payoffs)
-    apply_action = staticmethod(apply_action)
-    undo_action = staticmethod(undo_action)
-    is_chance_node = staticmethod(is_chance_node)
-    sample_chance = staticmethod(sample_chance)
-
-
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--strategy", "-s", default="output/blueprint.pkl", help="Path to saved strategy")
@@ -66,7 +42,9 @@ def main():
         print(f"Strategy file not found: {path}")
         sys.exit(1)
 
-    game = GameModule()
+    # The env module itself is the game interface CFRTrainer expects;
+    # its functions resolve by plain module attribute lookup.
+    game = game_env
     trainer = CFRTrainer(game, num_players=NUM_PLAYERS)
     trainer.load(path)
 
@@ -17,18 +17,7 @@ ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from poker_collusion.env import (
-    deal_new_hand,
-    get_current_player,
-    get_legal_actions,
-    get_info_key,
-    is_terminal,
-    get_payoffs,
-    apply_action,
-    undo_action,
-    is_chance_node,
-    sample_chance,
-)
+from poker_collusion import env as game_env
 from poker_collusion.cfr import CFRTrainer
 from poker_collusion.evaluation import evaluate_with_variance
 from poker_collusion.config import (
@@ -43,20 +32,6 @@ from poker_collusion.config import (
 )
 
 
-# Game module interface for CFR (env is the module)
-class GameModule:
-    deal_new_hand = staticmethod(deal_new_hand)
-    get_current_player = staticmethod(get_current_player)
-    get_legal_actions = staticmethod(get_legal_actions)
-    get_info_key = staticmethod(get_info_key)
-    is_terminal = staticmethod(is_terminal)
-    get_payoffs = staticmethod(get_payoffs)
-    apply_action = staticmethod(apply_action)
-    undo_action = staticmethod(undo_action)
-    is_chance_node = staticmethod(is_chance_node)
-    sample_chance = staticmethod(sample_chance)
-
-
 def main():
     ap = argparse.ArgumentParser(description="MCCFR training; optionally resume from --load and/or checkpoint with --checkpoint-every")
     ap.add_argument("--iterations", "-n", type=int, default=T_MAX_DEFAULT, help="Training iterations (additional if --load)")
@@ -68,7 +43,9 @@ def main():
     ap.add_argument("--eval-hands", type=int, default=EVAL_HANDS_DEFAULT, help="Hands for post-training eval")
     args = ap.parse_args()
 
-    game = GameModule()
+    # The env module itself is the game interface CFRTrainer expects;
+    # its functions resolve by plain module attribute lookup.
+    game = game_env
     trainer = CFRTrainer(
         game,
         num_players=NUM_PLAYERS,